@@ -0,0 +1,126 @@
+"""Precomputed allocation table and per-bucket fund bundles.
+
+The allocation rules only look at risk (low / moderate / anything else),
+horizon (1-3, 3-5, 10+ / anything else) and whether the goal is tax_saving,
+so every profile falls into one of 24 buckets. The normalized weights for
+all buckets are computed once at import; for batches the investment
+amounts are applied as one vectorized multiply. Each bucket also gets a
+ready-made top-2 fund bundle per category, rebuilt only when the fund
+snapshot changes.
+"""
+import threading
+from typing import Dict, Tuple
+
+import numpy as np
+
+from fund_record import FundRecord
+
+RISK_BUCKETS = ('low', 'moderate', 'high')
+HORIZON_BUCKETS = ('1-3', '3-5', '5-10', '10+')
+GOAL_BUCKETS = ('tax_saving', 'other')
+
+FUNDS_PER_CATEGORY = 2
+
+
+def allocation_weights(risk, horizon, goal) -> Dict[str, float]:
+    """Category -> fraction of the portfolio (fractions sum to 1)"""
+    # 1. Base allocation on risk
+    if risk == 'low':
+        alloc = {'debt': 0.60, 'large_cap': 0.30, 'flexi_cap': 0.10}
+    elif risk == 'moderate':
+        alloc = {'debt': 0.20, 'large_cap': 0.40, 'flexi_cap': 0.25, 'mid_cap': 0.15}
+    else: # high
+        alloc = {'large_cap': 0.30, 'flexi_cap': 0.30, 'mid_cap': 0.20, 'small_cap': 0.20}
+
+    # 2. Adjust for investment horizon
+    if horizon in ['1-3', '3-5']:
+        # Short horizon: increase debt, reduce small/mid caps
+        alloc['debt'] = alloc.get('debt', 0) + 0.20
+        alloc['small_cap'] = 0
+        alloc['mid_cap'] = alloc.get('mid_cap', 0) * 0.5
+    elif horizon == '10+':
+        # Long horizon: can take more risk
+        alloc['debt'] = max(0, alloc.get('debt', 0) - 0.10)
+
+    # 3. Adjust for specific goals
+    if goal == 'tax_saving':
+        # Ensure ELSS (tax_saving) funds are included
+        alloc['tax_saving'] = alloc.get('tax_saving', 0) + 0.15
+
+    # 4. Normalize percentages to add up to 100%
+    total_pct = sum(alloc.values())
+    return {k: v / total_pct for k, v in alloc.items() if v > 0}
+
+
+def profile_bucket(risk, horizon, goal) -> Tuple[str, str, str]:
+    """Map raw profile values onto the grid the allocation rules distinguish"""
+    return (
+        risk if risk in ('low', 'moderate') else 'high',
+        horizon if horizon in ('1-3', '3-5', '10+') else '5-10',
+        'tax_saving' if goal == 'tax_saving' else 'other',
+    )
+
+
+class AllocationPlan:
+    __slots__ = ('categories', 'weights', 'fractions', 'percentages')
+
+    def __init__(self, weights: Dict[str, float]):
+        self.categories = tuple(weights)
+        self.weights = tuple(weights[c] for c in self.categories)
+        self.fractions = np.array(self.weights, dtype=np.float64)
+        self.fractions.setflags(write=False)
+        self.percentages = tuple(round(v * 100) for v in self.weights)
+
+    def allocations(self, invest_amount: float) -> Dict[str, Dict[str, int]]:
+        # For a single profile (at most five categories) plain floats beat a
+        # NumPy round trip; amount_matrix is the vectorized path for batches
+        return {
+            c: {'percentage': p, 'amount': round(invest_amount * v)}
+            for c, p, v in zip(self.categories, self.percentages, self.weights)
+        }
+
+    def amount_matrix(self, invest_amounts: np.ndarray) -> np.ndarray:
+        """Rupee amounts for many profiles at once: shape (profiles, categories).
+
+        np.round and round() both round half to even on the same doubles, so
+        this matches allocations() element for element.
+        """
+        return np.round(np.asarray(invest_amounts, dtype=np.float64)[:, None] * self.fractions[None, :])
+
+
+ALLOCATION_TABLE = {
+    (risk, horizon, goal): AllocationPlan(allocation_weights(risk, horizon, goal))
+    for risk in RISK_BUCKETS for horizon in HORIZON_BUCKETS for goal in GOAL_BUCKETS
+}
+
+
+class AllocationPlanner:
+    """Holds the fund bundles for one snapshot; rebuilt lazily on snapshot change"""
+
+    def __init__(self):
+        self._state = (None, {})
+        self._lock = threading.Lock()
+
+    def bundle(self, snapshot, bucket: Tuple[str, str, str]) -> Dict[str, Tuple[FundRecord, ...]]:
+        """Shared category -> top fund record tuples for a bucket"""
+        built_for, bundles = self._state
+        if built_for is not snapshot:
+            bundles = self._rebuild(snapshot)
+        return bundles[bucket]
+
+    def _rebuild(self, snapshot):
+        with self._lock:
+            built_for, bundles = self._state
+            if built_for is snapshot:
+                return bundles
+            top = {}
+            bundles = {}
+            for bucket, plan in ALLOCATION_TABLE.items():
+                bundles[bucket] = {}
+                for category in plan.categories:
+                    if category not in top:
+                        top[category] = tuple(snapshot.ranked(category)[:FUNDS_PER_CATEGORY])
+                    bundles[bucket][category] = top[category]
+            # Publish the pair in one assignment so readers never mix snapshots
+            self._state = (snapshot, bundles)
+            return bundles
@@ -1,29 +1,76 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 import os
 from dotenv import load_dotenv
+import threading
 import traceback
+import time
+import io
+import shutil
+import tempfile
 
 # Load environment variables first
 load_dotenv()
 
-from mutual_fund_analyzer import MutualFundAnalyzer
-from llm_recommender import LLMRecommender
+from fund_record import FundRecord
+from instrumentation import get_logger, render_metrics
+
+log = get_logger('app')
+
+
+class FundJSONProvider(DefaultJSONProvider):
+    # Shared fund records serialize as plain objects
+    @staticmethod
+    def default(o):
+        if isinstance(o, FundRecord):
+            return o.as_dict()
+        return DefaultJSONProvider.default(o)
+
 
 app = Flask(__name__)
+app.json = FundJSONProvider(app)
 app.secret_key = os.getenv('SECRET_KEY', 'a-strong-default-secret-key')
 
-print("--- Flask App Initializing ---")
+log.info("Flask app initializing")
 if not os.getenv('GEMINI_API_KEY'):
-    print("CRITICAL STARTUP WARNING: GEMINI_API_KEY IS NOT SET.")
+    log.critical("GEMINI_API_KEY is not set")
 else:
-    print("OK: GEMINI_API_KEY found.")
+    log.info("GEMINI_API_KEY found")
+
+# --- Lazily created singletons ---
+# A cold serverless start that only renders / should not pay for NumPy, the
+# fund snapshot or the Gemini SDK. Each is imported and built on first use
+# and then reused for the life of the process.
+_analyzer = None
+_llm_recommender = None
+_init_lock = threading.Lock()
+
+
+def get_analyzer():
+    global _analyzer
+    if _analyzer is None:
+        with _init_lock:
+            if _analyzer is None:
+                from mutual_fund_analyzer import MutualFundAnalyzer
+                _analyzer = MutualFundAnalyzer()
+                log.info("Analyzer initialized")
+    return _analyzer
 
-try:
-    analyzer = MutualFundAnalyzer()
-    llm_recommender = LLMRecommender()
-    print("OK: Analyzer and LLMRecommender initialized.")
-except Exception as e:
-    print(f"CRITICAL STARTUP ERROR: {e}")
+
+def get_llm_recommender():
+    global _llm_recommender
+    if _llm_recommender is None:
+        with _init_lock:
+            if _llm_recommender is None:
+                from llm_recommender import LLMRecommender
+                _llm_recommender = LLMRecommender()
+                log.info("LLMRecommender initialized")
+    return _llm_recommender
+
+
+def _analyze_deadline():
+    from async_llm import ANALYZE_DEADLINE_SECONDS
+    return time.monotonic() + ANALYZE_DEADLINE_SECONDS
 
 @app.route('/')
 def index():
@@ -31,39 +78,20 @@ def index():
 
 @app.route('/analyze', methods=['POST'])
 def analyze():
-    print("\n--- Received /analyze request ---")
+    log.debug("Received /analyze request")
+    deadline = _analyze_deadline()
     try:
+        from mutual_fund_analyzer import build_user_info
+        analyzer = get_analyzer()
         data = request.get_json()
         
-        # --- Updated to receive ALL fields from the detailed form ---
-        user_info = {
-            'name': data.get('name', 'User'),
-            'age': data.get('age', 30),
-            'annual_income': data.get('annual_income', 500000),
-            'investment_amount': data.get('investment_amount', 50000),
-            'risk_tolerance': data.get('risk_tolerance', 'moderate'),
-            'investment_goal': data.get('investment_goal', 'wealth_creation'),
-            'investment_horizon': data.get('investment_horizon', '5-10'),
-            'monthly_sip': data.get('monthly_sip', 0),
-            'existing_investments': data.get('existing_investments', 0),
-            'tax_bracket': data.get('tax_bracket', 30),
-            'emergency_fund': data.get('emergency_fund', 'yes'),
-            'fund_type_preference': data.get('fund_type_preference', 'direct'),
-            'esg_preference': data.get('esg_preference', 'no_preference'),
-            'dividend_preference': data.get('dividend_preference', 'growth'),
-        }
-        print(f"DEBUG: Processing user_info: {user_info}")
+        user_info = build_user_info(data)
+        log.debug("Processing user_info: %s", user_info)
         
         # --- Using the LIVE AI call ---
-        print("DEBUG: Getting basic recommendations...")
         recommendations = analyzer.get_recommendations(user_info)
         
-        print("DEBUG: Getting AI analysis...")
-        llm_analysis = llm_recommender.generate_recommendations(user_info, recommendations)
-        
-        for category, funds in recommendations.get('recommendations', {}).items():
-            for fund in funds:
-                fund['grow_url'] = analyzer.get_grow_url(fund.get('name', ''))
+        llm_analysis = get_llm_recommender().generate_recommendations(user_info, recommendations, deadline=deadline)
         
         response_data = {
             'success': True,
@@ -72,29 +100,223 @@ def analyze():
             'user_info': user_info
         }
         
-        print("--- /analyze request completed successfully. ---")
+        log.debug("/analyze request completed")
         return jsonify(response_data)
         
     except Exception as e:
         error_traceback_string = traceback.format_exc()
-        print(f"--- CRASH IN /analyze ---\n{error_traceback_string}\n--------------------")
+        log.error("Crash in /analyze\n%s", error_traceback_string)
         return jsonify({
             'success': False,
             'error': 'A fatal server-side error occurred.',
             'debug_traceback': error_traceback_string 
         }), 500
 
-@app.route('/top-funds', methods=['POST'])
+def _ndjson(event):
+    return app.json.dumps(event) + "\n"
+
+@app.route('/analyze/stream', methods=['POST'])
+def analyze_stream():
+    """NDJSON variant of /analyze: rule-based results first, then LLM tokens.
+
+    Events, one JSON object per line:
+      {"type": "recommendations", "recommendations": ..., "user_info": ...}
+      {"type": "token", "text": ...}            (zero or more)
+      {"type": "analysis", "llm_analysis": ...}
+      {"type": "done", "success": true}         or {"type": "error", ...}
+    """
+    log.debug("Received /analyze/stream request")
+    deadline = _analyze_deadline()
+    try:
+        from mutual_fund_analyzer import build_user_info
+        analyzer = get_analyzer()
+        llm_recommender = get_llm_recommender()
+        user_info = build_user_info(request.get_json())
+        recommendations = analyzer.get_recommendations(user_info)
+    except Exception as e:
+        error_traceback_string = traceback.format_exc()
+        log.error("Crash in /analyze/stream\n%s", error_traceback_string)
+        return jsonify({'success': False, 'error': 'A fatal server-side error occurred.'}), 500
+
+    def generate():
+        yield _ndjson({'type': 'recommendations', 'recommendations': recommendations, 'user_info': user_info})
+        try:
+            for kind, payload in llm_recommender.stream_recommendations(user_info, recommendations, deadline=deadline):
+                if kind == 'token':
+                    yield _ndjson({'type': 'token', 'text': payload})
+                else:
+                    yield _ndjson({'type': 'analysis', 'llm_analysis': payload})
+            yield _ndjson({'type': 'done', 'success': True})
+        except Exception as e:
+            log.exception("Crash in /analyze/stream")
+            yield _ndjson({'type': 'error', 'success': False, 'error': 'A fatal server-side error occurred.'})
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/analyze/batch', methods=['POST'])
+def analyze_batch():
+    """Bulk analysis: a JSON list of user_info dicts, or an uploaded
+    CSV/JSONL/JSON file in the 'file' field (CSV and JSONL are read row by
+    row; a JSON array is loaded whole). Streams JSONL results in input
+    order; pass ?llm=0 for rule-based recommendations only and ?workers=N
+    (1-32) for concurrent LLM calls."""
+    log.debug("Received /analyze/batch request")
+    if not _is_admin():
+        return jsonify({'success': False, 'error': 'Forbidden'}), 403
+    try:
+        from batch_analysis import MAX_WORKERS, BatchRunner, detect_format, read_profiles
+        try:
+            workers = min(max(int(request.args.get('workers', 8)), 1), MAX_WORKERS)
+        except ValueError:
+            return jsonify({'success': False, 'error': 'workers must be an integer'}), 400
+        upload = request.files.get('file')
+        if upload is not None:
+            # Werkzeug closes uploads when the view returns, before streaming
+            # finishes, so spool the file to disk first (memory stays flat)
+            spooled = tempfile.TemporaryFile()
+            shutil.copyfileobj(upload.stream, spooled)
+            spooled.seek(0)
+            stream = io.TextIOWrapper(spooled, encoding='utf-8', newline='')
+            profiles = read_profiles(stream, detect_format(upload.filename or ''))
+        else:
+            profiles = request.get_json()
+            if not isinstance(profiles, list):
+                return jsonify({'success': False, 'error': 'Expected a JSON list of profiles'}), 400
+        use_llm = request.args.get('llm', '1') != '0'
+        runner = BatchRunner(get_analyzer(), get_llm_recommender() if use_llm else None,
+                             max_workers=workers)
+    except Exception as e:
+        error_traceback_string = traceback.format_exc()
+        log.error("Crash in /analyze/batch\n%s", error_traceback_string)
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+    def generate():
+        try:
+            for result in runner.run(profiles):
+                yield app.json.dumps(result) + "\n"
+        except Exception as e:
+            log.exception("Crash in /analyze/batch")
+            yield app.json.dumps({'success': False, 'error': str(e)}) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@app.route('/top-funds', methods=['GET', 'POST'])
 def get_top_funds():
-    print("\n--- Received /top-funds request ---")
+    log.debug("Received /top-funds request")
     try:
-        data = request.get_json()
-        category = data.get('category', 'large_cap')
-        top_funds = analyzer.get_top_funds(category)
-        for fund in top_funds:
-            fund['grow_url'] = analyzer.get_grow_url(fund.get('name', ''))
-        return jsonify({'success': True, 'funds': top_funds})
+        if request.method == 'POST':
+            category = (request.get_json() or {}).get('category', 'large_cap')
+        else:
+            category = request.args.get('category', 'large_cap')
+        # Serialized and compressed once per fund snapshot
+        payload = get_analyzer().top_funds_payload(category)
+        encoding = payload.negotiate(request.accept_encodings)
+        etag = payload.tag(encoding)
+        if request.method == 'GET' and request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            response = Response(payload.bodies[encoding], mimetype='application/json')
+            if encoding != 'identity':
+                response.headers['Content-Encoding'] = encoding
+        response.set_etag(etag)
+        response.headers['Vary'] = 'Accept-Encoding'
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    except Exception as e:
+        error_traceback_string = traceback.format_exc()
+        log.error("Crash in /top-funds\n%s", error_traceback_string)
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/funds/search', methods=['GET'])
+def search_funds():
+    # e.g. /funds/search?category=debt&max_expense_ratio=0.5&sort=sharpe_ratio&limit=10
+    from fund_search import parse_query
+    try:
+        analyzer = get_analyzer()
+        query = parse_query(request.args, analyzer.search_fields())
+        result = analyzer.search_funds(query)
+        return jsonify({'success': True, **result})
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         error_traceback_string = traceback.format_exc()
-        print(f"--- CRASH IN /top-funds ---\n{error_traceback_string}\n-----------------------")
+        log.error("Crash in /funds/search\n%s", error_traceback_string)
         return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/funds/<fund_id>/metrics', methods=['GET'])
+def fund_metrics(fund_id):
+    # e.g. /funds/F001/metrics?window=3y&benchmark=NIFTY50, computed from NAV history
+    try:
+        window = request.args.get('window', '1y')
+        metrics = get_analyzer().fund_metrics(fund_id, window, request.args.get('benchmark') or None)
+        if metrics is None:
+            return jsonify({'success': False, 'error': 'No NAV history for this fund'}), 404
+        metrics = {name: None if value != value else round(value, 4) for name, value in metrics.items()}
+        return jsonify({'success': True, 'window': window, 'metrics': metrics})
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        error_traceback_string = traceback.format_exc()
+        log.error("Crash in /funds/metrics\n%s", error_traceback_string)
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+def _is_admin():
+    # Admin endpoints are disabled unless ADMIN_TOKEN is set
+    admin_token = os.getenv('ADMIN_TOKEN')
+    return bool(admin_token) and request.headers.get('X-Admin-Token') == admin_token
+
+@app.route('/admin/reload', methods=['POST'])
+def admin_reload():
+    # Explicit trigger for the daily data refresh
+    if not _is_admin():
+        return jsonify({'success': False, 'error': 'Forbidden'}), 403
+    try:
+        analyzer = get_analyzer()
+        reloaded = analyzer.reload(force=request.args.get('force') == '1')
+        return jsonify({'success': True, 'reloaded': reloaded, 'snapshot': analyzer.snapshot.info()})
+    except Exception as e:
+        error_traceback_string = traceback.format_exc()
+        log.error("Crash in /admin/reload\n%s", error_traceback_string)
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/admin/score-window', methods=['POST'])
+def admin_score_window():
+    # Rank on NAV history metrics for a window, or {"window": null} for the CSV fields
+    if not _is_admin():
+        return jsonify({'success': False, 'error': 'Forbidden'}), 403
+    try:
+        data = request.get_json() or {}
+        analyzer = get_analyzer()
+        reloaded = analyzer.set_score_window(data.get('window'), data.get('benchmark'))
+        return jsonify({'success': True, 'reloaded': reloaded, 'snapshot': analyzer.snapshot.info()})
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        error_traceback_string = traceback.format_exc()
+        log.error("Crash in /admin/score-window\n%s", error_traceback_string)
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    # Prometheus text exposition; per worker process under gunicorn.
+    # Scrapes must not force the lazy singletons into existence.
+    extra = []
+    if _analyzer is not None:
+        snapshot = _analyzer.snapshot
+        extra = [
+            "# HELP mf_fund_snapshot_funds Funds in the current snapshot.",
+            "# TYPE mf_fund_snapshot_funds gauge",
+            f"mf_fund_snapshot_funds {len(snapshot.ranked_all)}",
+            "# HELP mf_fund_snapshot_loaded_timestamp_seconds When the current snapshot was loaded.",
+            "# TYPE mf_fund_snapshot_loaded_timestamp_seconds gauge",
+            f"mf_fund_snapshot_loaded_timestamp_seconds {snapshot.loaded_at:.3f}",
+        ]
+    return Response(render_metrics(extra), mimetype='text/plain; version=0.0.4')
+
+@app.route('/admin/cache-stats', methods=['GET'])
+def admin_cache_stats():
+    if not _is_admin():
+        return jsonify({'success': False, 'error': 'Forbidden'}), 403
+    cache = _llm_recommender.cache if _llm_recommender is not None else None
+    return jsonify({'success': True, 'llm_cache': cache.stats() if cache is not None else None})
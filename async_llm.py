@@ -0,0 +1,124 @@
+"""Asyncio-based LLM client with bounded concurrency and per-call deadlines.
+
+Flask views stay synchronous: each call is submitted to one private event
+loop running in a background thread, and the calling thread waits on the
+result until its deadline. Model calls are awaited rather than held in a
+thread, so a single gunicorn gthread worker can hold many analyses in flight
+while the semaphore caps how many actually hit the API at once.
+"""
+import asyncio
+import concurrent.futures
+import os
+import queue
+import threading
+import time
+from typing import Any, Iterator, Optional
+
+LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', 8))
+
+# Vercel kills the function at maxDuration (45s); leave room for the fallback
+ANALYZE_DEADLINE_SECONDS = float(os.getenv('ANALYZE_DEADLINE_SECONDS', 40))
+
+
+class LLMDeadlineExceeded(TimeoutError):
+    pass
+
+
+_STREAM_DONE = object()
+
+
+class AsyncLLMClient:
+    def __init__(self, model, max_concurrency: int = LLM_MAX_CONCURRENCY):
+        self.model = model
+        self.max_concurrency = max_concurrency
+        self._loop = None
+        self._semaphore = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        # Started lazily so the loop thread is created in the serving process,
+        # never inherited across a gunicorn fork
+        if self._loop is None:
+            with self._start_lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    threading.Thread(target=loop.run_forever, name="llm-event-loop", daemon=True).start()
+                    self._semaphore = asyncio.Semaphore(self.max_concurrency)
+                    self._loop = loop
+        return self._loop
+
+    async def _generate(self, prompt: str, generation_config: Any, timeout: float) -> str:
+        async with self._semaphore:
+            response = await self.model.generate_content_async(
+                prompt,
+                generation_config=generation_config,
+                request_options={'timeout': timeout},
+            )
+            return response.text
+
+    def generate(self, prompt: str, generation_config: Any, deadline: Optional[float] = None) -> str:
+        """Blocking call that returns the response text or raises by the deadline.
+
+        deadline is an absolute time.monotonic() value. On expiry the pending
+        call (including time spent waiting for the semaphore) is cancelled.
+        """
+        if deadline is None:
+            deadline = time.monotonic() + ANALYZE_DEADLINE_SECONDS
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise LLMDeadlineExceeded("deadline already passed before the LLM call")
+
+        loop = self._ensure_loop()
+        future = asyncio.run_coroutine_threadsafe(self._generate(prompt, generation_config, remaining), loop)
+        try:
+            return future.result(timeout=remaining)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise LLMDeadlineExceeded(f"LLM call exceeded its {remaining:.1f}s budget")
+
+
+    def stream(self, prompt: str, generation_config: Any, deadline: Optional[float] = None) -> Iterator[str]:
+        """Yield response text chunks as they arrive, under the same deadline rules.
+
+        If the consumer stops iterating early (e.g. the HTTP client went away),
+        the underlying call is cancelled.
+        """
+        if deadline is None:
+            deadline = time.monotonic() + ANALYZE_DEADLINE_SECONDS
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise LLMDeadlineExceeded("deadline already passed before the LLM call")
+
+        chunks = queue.Queue()
+
+        async def pump():
+            try:
+                async with self._semaphore:
+                    response = await self.model.generate_content_async(
+                        prompt,
+                        generation_config=generation_config,
+                        stream=True,
+                        request_options={'timeout': remaining},
+                    )
+                    async for chunk in response:
+                        chunks.put(chunk.text)
+            except Exception as e:
+                chunks.put(e)
+            finally:
+                chunks.put(_STREAM_DONE)
+
+        loop = self._ensure_loop()
+        future = asyncio.run_coroutine_threadsafe(pump(), loop)
+        try:
+            while True:
+                try:
+                    item = chunks.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    raise LLMDeadlineExceeded(f"LLM stream exceeded its {remaining:.1f}s budget")
+                if item is _STREAM_DONE:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            future.cancel()
@@ -0,0 +1,299 @@
+"""Bulk advisory runs over many client profiles.
+
+Profiles are read lazily from a CSV or JSONL file (or any iterable of dicts)
+and processed in fixed-size chunks, and results are written as JSONL in
+input order, so memory stays flat however large the batch is. A JSON-array
+file is parsed whole before the first chunk; use JSONL for large batches.
+Within a chunk:
+
+- profiles in the same allocation bucket (see allocation_planner) share
+  one prebuilt fund bundle; the rupee amounts for the whole group are one
+  NumPy multiply over the allocation weights
+- projections share one return/volatility estimate per bucket and can be
+  spread over a process pool (--projection-processes) for large batches
+- LLM calls fan out over a bounded thread pool with retry and exponential
+  backoff, falling back to the rule-based analysis when retries run out
+
+    python batch_analysis.py profiles.csv -o results.jsonl --workers 8
+"""
+import argparse
+import csv
+import io
+import json
+import math
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from allocation_planner import ALLOCATION_TABLE, HORIZON_BUCKETS, profile_bucket
+from fund_record import json_default
+from mutual_fund_analyzer import USER_INFO_DEFAULTS, build_user_info
+from projections import portfolio_assumptions, project_many
+
+CHUNK_SIZE = 500
+MAX_WORKERS = 32  # upper bound on concurrent LLM calls per batch
+# Inclusive bounds for numeric profile fields; the others must be >= 0
+NUMERIC_RANGES = {'age': (0, 120), 'tax_bracket': (0, 100)}
+
+
+def _coerce_field(field: str, value: Any) -> Any:
+    # CSV cells arrive as strings; convert them to the type of the default
+    default = USER_INFO_DEFAULTS.get(field)
+    if not isinstance(value, str) or isinstance(default, str) or default is None:
+        return value
+    try:
+        return int(value) if isinstance(default, int) and value.strip().lstrip('-').isdigit() else float(value)
+    except ValueError:
+        return value  # left as text so validate_profile rejects the row
+
+
+def read_profiles(stream: io.TextIOBase, fmt: str) -> Iterator[Any]:
+    """Yield raw profile dicts from a csv, jsonl or json stream.
+
+    csv and jsonl are read row by row; json (one array) is loaded whole.
+    A jsonl line that is not valid JSON yields a ValueError in its place,
+    which BatchRunner reports as that row's error.
+    """
+    if fmt == 'csv':
+        for row in csv.DictReader(stream):
+            yield {k: _coerce_field(k, v) for k, v in row.items() if v not in (None, '')}
+    elif fmt == 'jsonl':
+        for number, line in enumerate(stream, 1):
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield ValueError(f"line {number}: invalid JSON ({e.msg})")
+    elif fmt == 'json':
+        yield from json.load(stream)
+    else:
+        raise ValueError(f"Unsupported profile format: {fmt}")
+
+
+def _number(field: str, value: Any) -> Any:
+    """A numeric profile field, parsed and range-checked"""
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise ValueError(f"{field} must be a number, got {value!r}")
+    try:
+        number = float(value)
+    except ValueError:
+        raise ValueError(f"{field} must be a number, got {value!r}")
+    if not math.isfinite(number):
+        raise ValueError(f"{field} must be a finite number")
+    low, high = NUMERIC_RANGES.get(field, (0, math.inf))
+    if not low <= number <= high:
+        raise ValueError(f"{field} must be between {low} and {high}, got {value!r}" if high < math.inf
+                         else f"{field} must not be negative, got {value!r}")
+    if isinstance(value, str):
+        return int(number) if number.is_integer() else number
+    return value
+
+
+def validate_profile(data: Any) -> Dict[str, Any]:
+    """user_info for one raw profile; ValueError for a malformed row"""
+    if isinstance(data, ValueError):
+        raise data  # a row read_profiles could not parse
+    if not isinstance(data, dict):
+        raise ValueError(f"profile must be an object, got {type(data).__name__}")
+    user_info = build_user_info(data)
+    for field, default in USER_INFO_DEFAULTS.items():
+        if isinstance(default, str):
+            # Text fields pick the allocation bucket and must be hashable strings
+            if not isinstance(user_info[field], str):
+                raise ValueError(f"{field} must be a string")
+        else:
+            # Amounts feed the projections and the summary text
+            user_info[field] = _number(field, user_info[field])
+    if user_info['investment_horizon'] not in HORIZON_BUCKETS:
+        raise ValueError(f"investment_horizon must be one of {', '.join(HORIZON_BUCKETS)}, "
+                         f"got {user_info['investment_horizon']!r}")
+    return user_info
+
+
+def _validated(data: Any) -> Any:
+    try:
+        return validate_profile(data)
+    except ValueError as e:
+        return e
+
+
+def detect_format(filename: str) -> str:
+    name = filename.lower()
+    if name.endswith('.csv'): return 'csv'
+    if name.endswith(('.jsonl', '.ndjson')): return 'jsonl'
+    return 'json'
+
+
+class BatchRunner:
+    def __init__(self, analyzer, llm_recommender=None, max_workers: int = 8,
+                 retries: int = 3, backoff: float = 1.0, chunk_size: int = CHUNK_SIZE,
+                 projection_processes: Optional[int] = None):
+        self.analyzer = analyzer
+        self.llm_recommender = llm_recommender
+        self.max_workers = max_workers
+        self.retries = retries
+        self.backoff = backoff
+        self.chunk_size = chunk_size
+        self.projection_processes = projection_processes
+
+    def run(self, profiles: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Yield one result dict per input profile, in input order"""
+        profiles = iter(profiles)
+        index = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="batch-llm") as pool:
+            while True:
+                chunk = list(islice(profiles, self.chunk_size))
+                if not chunk:
+                    break
+                yield from self._run_chunk(chunk, index, pool)
+                index += len(chunk)
+
+    def _run_chunk(self, chunk: List[Dict[str, Any]], start: int, pool) -> Iterator[Dict[str, Any]]:
+        # A malformed row fails on its own; the rest of the chunk still runs
+        user_infos = [_validated(data) for data in chunk]
+        recommendations = self._rule_based(user_infos)
+
+        futures = []
+        for user_info, recs in zip(user_infos, recommendations):
+            if self.llm_recommender is None or isinstance(recs, Exception):
+                futures.append(None)
+            else:
+                futures.append(pool.submit(self._llm_with_retry, user_info, recs))
+
+        for offset, (user_info, recs, future) in enumerate(zip(user_infos, recommendations, futures)):
+            if isinstance(user_info, Exception):
+                yield {'index': start + offset, 'success': False, 'error': str(user_info)}
+                continue
+            result = {'index': start + offset, 'user_info': user_info}
+            if isinstance(recs, Exception):
+                result.update(success=False, error=str(recs))
+            else:
+                result.update(success=True, recommendations=recs)
+                if future is not None:
+                    try:
+                        result['llm_analysis'], result['llm_status'] = future.result()
+                    except Exception as e:
+                        # Even the rule-based fallback failed; only this row is lost
+                        result = {'index': start + offset, 'user_info': user_info,
+                                  'success': False, 'error': f"LLM analysis failed: {e}"}
+            yield result
+
+    def _rule_based(self, user_infos: List[Any]) -> List[Any]:
+        # One snapshot for the whole chunk, one fund bundle per allocation bucket
+        self.analyzer.maybe_reload()
+        snapshot = self.analyzer.snapshot
+        results = list(user_infos)  # invalid rows keep their error
+        groups = {}
+        for i, user_info in enumerate(user_infos):
+            if isinstance(user_info, Exception):
+                continue
+            bucket = profile_bucket(user_info['risk_tolerance'], user_info['investment_horizon'],
+                                    user_info['investment_goal'])
+            groups.setdefault(bucket, []).append(i)
+
+        projection_rows, projection_args = [], []
+        for bucket, rows in groups.items():
+            plan = ALLOCATION_TABLE[bucket]
+            # Shared immutable records, grow_url included
+            bundles = self.analyzer.planner.bundle(snapshot, bucket)
+            funds = {category: list(bundle) for category, bundle in bundles.items()}
+
+            invest = [self.analyzer._safe_to_float(user_infos[i]['investment_amount']) for i in rows]
+            amounts = plan.amount_matrix(invest)
+            annual_return = annual_volatility = None
+            for i, row_amounts in zip(rows, amounts):
+                if not np.isfinite(row_amounts).all():
+                    results[i] = ValueError("investment_amount must be a finite number")
+                    continue
+                allocations = {
+                    c: {'percentage': p, 'amount': int(a)}
+                    for c, p, a in zip(plan.categories, plan.percentages, row_amounts.tolist())
+                }
+                results[i] = {
+                    'recommendations': funds,
+                    'allocations': allocations,
+                    'risk_profile': user_infos[i]['risk_tolerance'],
+                }
+                if annual_return is None:
+                    # Percentages and funds are the same for the whole bucket
+                    annual_return, annual_volatility = portfolio_assumptions(allocations, funds)
+                user_info = user_infos[i]
+                projection_rows.append(i)
+                projection_args.append((user_info['investment_amount'], user_info['monthly_sip'],
+                                        user_info['investment_horizon'], annual_return, annual_volatility))
+
+        projections = project_many(projection_args, processes=self.projection_processes)
+        for i, projection in zip(projection_rows, projections):
+            recs = results[i]
+            advanced_analysis = self.analyzer.analytics.analyze(snapshot, user_infos[i], recs['allocations'],
+                                                                recs['recommendations'], projection)
+            advanced_analysis['projections'] = projection
+            recs['advanced_analysis'] = advanced_analysis
+        return results
+
+    def _llm_with_retry(self, user_info: Dict[str, Any], recs: Dict[str, Any]):
+        for attempt in range(self.retries + 1):
+            try:
+                analysis = self.llm_recommender.generate_recommendations(user_info, recs, fallback=False)
+                return analysis, 'ok'
+            except Exception as e:
+                if attempt == self.retries:
+                    break
+                # Exponential backoff with jitter so workers do not retry in lockstep
+                time.sleep(self.backoff * (2 ** attempt) * (0.5 + random.random()))
+        return self.llm_recommender._generate_fallback_recommendations(user_info, recs), 'fallback'
+
+
+def write_jsonl(results: Iterable[Dict[str, Any]], out: io.TextIOBase,
+                dumps=partial(json.dumps, default=json_default)) -> int:
+    count = 0
+    for result in results:
+        out.write(dumps(result) + "\n")
+        count += 1
+    return count
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Run advisory analysis for a file of client profiles.")
+    parser.add_argument('profiles', help="CSV, JSONL or JSON-array file of user_info dicts ('-' for stdin JSONL)")
+    parser.add_argument('-o', '--output', required=True, help="JSONL output path ('-' for stdout)")
+    parser.add_argument('--workers', type=int, default=8, help="concurrent LLM calls")
+    parser.add_argument('--retries', type=int, default=3)
+    parser.add_argument('--backoff', type=float, default=1.0, help="initial retry delay in seconds")
+    parser.add_argument('--no-llm', action='store_true', help="rule-based recommendations only")
+    parser.add_argument('--projection-processes', type=int, default=None,
+                        help="worker processes for Monte Carlo projections (default: in-process)")
+    args = parser.parse_args(argv)
+
+    from dotenv import load_dotenv
+    from mutual_fund_analyzer import MutualFundAnalyzer
+    load_dotenv()
+
+    analyzer = MutualFundAnalyzer()
+    llm_recommender = None
+    if not args.no_llm:
+        from llm_recommender import LLMRecommender
+        llm_recommender = LLMRecommender()
+    runner = BatchRunner(analyzer, llm_recommender, max_workers=args.workers,
+                         retries=args.retries, backoff=args.backoff,
+                         projection_processes=args.projection_processes)
+
+    source = sys.stdin if args.profiles == '-' else open(args.profiles, newline='', encoding='utf-8')
+    out = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    fmt = 'jsonl' if args.profiles == '-' else detect_format(args.profiles)
+    try:
+        count = write_jsonl(runner.run(read_profiles(source, fmt)), out)
+    finally:
+        if source is not sys.stdin: source.close()
+        if out is not sys.stdout: out.close()
+    print(f"OK: wrote {count} results", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""Cold-start benchmark: CSV parse with pandas vs the columnar binary cache.
+
+Each measurement runs in a fresh interpreter so import costs are included.
+
+    python benchmarks/bench_cold_start.py --rows 15000 --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from mutual_fund_analyzer import MutualFundAnalyzer
+analyzer = MutualFundAnalyzer(__import__('pathlib').Path(sys.argv[1]))
+analyzer.get_top_funds('large_cap')
+print(json.dumps({'seconds': time.perf_counter() - start, 'pandas_imported': 'pandas' in sys.modules}))
+"""
+
+
+def run_probe(path, cache_enabled, cache_dir):
+    env = dict(os.environ, FUND_CACHE='1' if cache_enabled else '0', FUND_CACHE_DIR=str(cache_dir),
+               PYTHONPATH=str(ROOT))
+    out = subprocess.run([sys.executable, '-c', PROBE, str(path)], env=env, cwd=ROOT,
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=15000)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    from bench_scoring import build_universe
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "funds.csv"
+        build_universe(args.rows).to_csv(path, index=False)
+        run_probe(path, True, tmp)  # first run writes the cache
+
+        for label, cache_enabled in (('csv (pandas)', False), ('binary cache', True)):
+            results = [run_probe(path, cache_enabled, tmp) for _ in range(args.runs)]
+            seconds = [r['seconds'] for r in results]
+            print(f"{label:<14} median {statistics.median(seconds) * 1000:8.1f} ms  "
+                  f"min {min(seconds) * 1000:8.1f} ms  pandas imported: {results[0]['pandas_imported']}")
+
+
+if __name__ == '__main__':
+    main()
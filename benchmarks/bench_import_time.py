@@ -0,0 +1,97 @@
+"""Import-time and cold-start benchmark for the Flask app.
+
+Every measurement runs in a fresh interpreter, like a cold serverless
+invocation:
+
+- `python -X importtime -c "import app"`, reporting the cumulative import
+  time of app and of the heavy dependencies it may pull in
+- time to first response for GET / and POST /top-funds, and which heavy
+  modules each route loaded
+- the same with the analyzer and LLM client built eagerly, which is what
+  importing app used to do
+
+    python benchmarks/bench_import_time.py --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+HEAVY_MODULES = ('numpy', 'pandas', 'google.generativeai', 'grpc', 'asyncio')
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import app
+if sys.argv[1] == 'eager':
+    app.get_analyzer()
+    app.get_llm_recommender()
+imported = time.perf_counter()
+client = app.app.test_client()
+if sys.argv[2] == 'index':
+    response = client.get('/')
+else:
+    response = client.post('/top-funds', json={'category': 'large_cap'})
+assert response.status_code == 200, response.status_code
+print(json.dumps({
+    'import': imported - start,
+    'first_response': time.perf_counter() - start,
+    'modules': [m for m in %r if m in sys.modules],
+}))
+""" % (HEAVY_MODULES,)
+
+
+def _env():
+    return dict(os.environ, PYTHONPATH=str(ROOT), LOG_LEVEL='WARNING')
+
+
+def import_times():
+    """Cumulative microseconds per module from -X importtime for `import app`"""
+    stderr = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app'], env=_env(), cwd=ROOT,
+                            capture_output=True, text=True, check=True).stderr
+    cumulative = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, name = line[len('import time:'):].split('|')
+        cumulative[name.strip()] = int(cumulative_us)
+    return cumulative
+
+
+def probe(mode, route):
+    out = subprocess.run([sys.executable, '-c', PROBE, mode, route], env=_env(), cwd=ROOT,
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    totals = [import_times() for _ in range(args.runs)]
+    print("-X importtime, `import app` (median cumulative ms):")
+    for name in ('app', 'flask') + HEAVY_MODULES:
+        values = [t[name] for t in totals if name in t]
+        if values:
+            print(f"  {name:<22}{statistics.median(values) / 1000:8.1f}")
+        else:
+            print(f"  {name:<22}{'not imported':>14}")
+
+    print("\nCold start to first response (median of fresh interpreters):")
+    print(f"  {'mode':<7}{'route':<11}{'import ms':>10}{'first resp ms':>15}  heavy modules loaded")
+    for mode in ('lazy', 'eager'):
+        for route in ('index', 'top-funds'):
+            results = [probe(mode, route) for _ in range(args.runs)]
+            print(f"  {mode:<7}{route:<11}{statistics.median(r['import'] for r in results) * 1000:>10.1f}"
+                  f"{statistics.median(r['first_response'] for r in results) * 1000:>15.1f}"
+                  f"  {', '.join(results[0]['modules']) or '-'}")
+
+
+if __name__ == '__main__':
+    main()
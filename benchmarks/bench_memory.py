@@ -0,0 +1,93 @@
+"""Per-request memory allocation on the /analyze path, measured with tracemalloc.
+
+Runs /analyze in-process (Flask test client, stub LLM backend with no
+latency, response cache off) and reports, per request, the peak traced
+memory above the pre-request baseline and the bytes still held afterwards,
+for the full route and for get_recommendations alone. Also reports how
+much memory the fund snapshot itself holds for a synthetic universe.
+
+    python benchmarks/bench_memory.py --requests 200 --rows 15000
+"""
+import argparse
+import gc
+import os
+import statistics
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+for name, value in {'LLM_BACKEND': 'stub', 'LLM_STUB_LATENCY': '0', 'LLM_STUB_JITTER': '0',
+                    'LLM_CACHE': 'off', 'LOG_LEVEL': 'WARNING'}.items():
+    os.environ.setdefault(name, value)
+
+from load_test import PROFILES  # noqa: E402
+
+
+def measure(call, requests, warmup=10):
+    """(median peak KiB above baseline, median KiB retained) per call"""
+    for i in range(warmup):
+        call(i)
+    peaks, retained = [], []
+    for i in range(requests):
+        gc.collect()
+        tracemalloc.start()
+        before, _ = tracemalloc.get_traced_memory()
+        call(i)
+        after, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peaks.append((peak - before) / 1024)
+        retained.append((after - before) / 1024)
+    return statistics.median(peaks), statistics.median(retained)
+
+
+def snapshot_footprint(rows):
+    from bench_scoring import build_universe
+    from fund_snapshot import FundSnapshot
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "funds.csv"
+        build_universe(rows).to_csv(path, index=False)
+        FundSnapshot.load(path)  # writes the column cache outside the measurement
+        gc.collect()
+        tracemalloc.start()
+        snapshot = FundSnapshot.load(path)
+        held, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    del snapshot
+    return held / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--rows', type=int, default=15000, help="synthetic universe size for the footprint")
+    args = parser.parse_args()
+
+    import app as app_module
+    from mutual_fund_analyzer import build_user_info
+
+    client = app_module.app.test_client()
+    analyzer = app_module.get_analyzer()
+    user_infos = [build_user_info(p) for p in PROFILES]
+
+    def analyze(i):
+        response = client.post('/analyze', json=PROFILES[i % len(PROFILES)])
+        assert response.status_code == 200, response.status_code
+        response.get_data()
+
+    def recommendations(i):
+        analyzer.get_recommendations(user_infos[i % len(user_infos)])
+
+    print(f"{'path':<24}{'peak KiB/request':>18}{'retained KiB':>14}")
+    for label, call in (('POST /analyze', analyze), ('get_recommendations', recommendations)):
+        peak, retained = measure(call, args.requests)
+        print(f"{label:<24}{peak:>18.1f}{retained:>14.1f}")
+    print(f"\nfund snapshot, {args.rows} funds: {snapshot_footprint(args.rows):.1f} MiB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""Benchmark the NAV history store and its window metrics.
+
+Generates five years of synthetic daily NAVs (a benchmark index plus one
+series per fund, each with its own beta) for a tiled fund universe, then:
+
+- times bulk CSV ingestion into the memory-mapped store
+- times window metrics for every fund, and checks them against a pandas
+  reference and against the last row of rolling()
+- appends one day to every series and times the incremental update
+  against a from-scratch recompute, checking that both agree
+- reloads the analyzer with history-based scoring for two windows and
+  shows how the top large-cap funds change
+
+    python benchmarks/bench_nav_history.py --funds 2000 --years 5
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+# The analyzer opens NAV_HISTORY_DIR when it is created; point it at a scratch store
+STORE_DIR = Path(tempfile.mkdtemp(prefix='nav_history_'))
+os.environ['NAV_HISTORY_DIR'] = str(STORE_DIR)
+
+from bench_scoring import build_universe  # noqa: E402
+
+BENCHMARK = 'NIFTY50'
+
+
+def synthetic_navs(ids, years, seed=11):
+    """Long-format frame of fund_id, date, nav for ids plus BENCHMARK"""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(end='2026-09-30', periods=years * 252)
+    market = rng.normal(0.12 / 252, 0.16 / np.sqrt(252), len(dates))
+    frames = [pd.DataFrame({'fund_id': BENCHMARK, 'date': dates, 'nav': 10000 * np.cumprod(1 + market)})]
+    betas = rng.uniform(0.5, 1.3, len(ids))
+    drifts = rng.normal(0.02 / 252, 0.03 / 252, len(ids))
+    noise = rng.normal(0, 0.006, (len(ids), len(dates)))
+    navs = 10 * np.cumprod(1 + drifts[:, None] + betas[:, None] * market[None, :] + noise, axis=1)
+    frames.append(pd.DataFrame({'fund_id': np.repeat(ids, len(dates)), 'date': np.tile(dates, len(ids)),
+                                'nav': navs.ravel().round(4)}))
+    return pd.concat(frames, ignore_index=True)
+
+
+def pandas_reference(navs, window, rf_daily):
+    returns = navs.pct_change().iloc[-window:]
+    annualize = np.sqrt(252)
+    excess = returns - rf_daily
+    return {
+        'volatility': returns.std() * annualize * 100,
+        'sharpe_ratio': excess.mean() / returns.std() * annualize,
+        'sortino_ratio': excess.mean() / np.sqrt((excess.clip(upper=0) ** 2).mean()) * annualize,
+        'max_drawdown': ((navs.iloc[-window - 1:] / navs.iloc[-window - 1:].cummax()) - 1).min() * 100,
+    }
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    result = fn()
+    print(f"  {label:<52}{(time.perf_counter() - start) * 1000:>10.1f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--funds', type=int, default=2000)
+    parser.add_argument('--years', type=int, default=5)
+    parser.add_argument('--window', default='1y')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        from mutual_fund_analyzer import MutualFundAnalyzer
+        from nav_history import NavHistory, window_days
+
+        universe = build_universe(args.funds)
+        universe.to_csv(tmp / "funds.csv", index=False)
+        ids = universe['id'].tolist()
+        frame = synthetic_navs(ids, args.years)
+        frame.to_csv(tmp / "navs.csv", index=False)
+        print(f"{args.funds} funds + benchmark, {args.years}y daily ({len(frame):,} rows), window {args.window}")
+
+        history = NavHistory(STORE_DIR)
+        stats = timed("ingest CSV", lambda: history.ingest_csv(tmp / "navs.csv"))
+        assert stats['added'] == len(frame), stats
+
+        columns = timed("metrics, every fund (cold)",
+                        lambda: history.metric_columns(ids, args.window, BENCHMARK))
+        size = window_days(args.window)
+        sample = frame[frame['fund_id'] == ids[0]].set_index('date')['nav']
+        reference = pandas_reference(sample, size, history.rf_daily)
+        for name, expected in reference.items():
+            assert np.isclose(columns[name][0], expected, rtol=1e-9), (name, columns[name][0], expected)
+        rolling = history.rolling(ids[0], args.window, BENCHMARK)
+        point = history.metrics(ids[0], args.window, BENCHMARK)
+        for name in ('return', 'volatility', 'sharpe_ratio', 'sortino_ratio', 'beta', 'alpha'):
+            assert np.isclose(rolling[name][-1], point[name], rtol=1e-9), name
+        print(f"  matches pandas and rolling(); beta range {np.nanmin(columns['beta']):.2f}-"
+              f"{np.nanmax(columns['beta']):.2f}")
+
+        next_day = np.datetime64(frame['date'].max().date()) + 1
+        rng = np.random.default_rng(5)
+
+        navs = {series_id: history.store.series(series_id).navs[-1] * (1 + rng.normal(0.0005, 0.01))
+                for series_id in ids + [BENCHMARK]}
+        timed("append one day to every series", lambda: history.append_day(next_day, navs))
+        incremental = timed("metrics, every fund (incremental)",
+                            lambda: history.metric_columns(ids, args.window, BENCHMARK))
+        fresh = timed("metrics, every fund (fresh NavHistory)",
+                      lambda: NavHistory(STORE_DIR).metric_columns(ids, args.window, BENCHMARK))
+        for name, values in incremental.items():
+            assert np.allclose(values, fresh[name], rtol=1e-9, equal_nan=True), name
+
+        analyzer = MutualFundAnalyzer(tmp / "funds.csv")
+        top_csv = [f['id'] for f in analyzer.get_top_funds('large_cap')]
+        print("\ntop large_cap funds by score input:")
+        print(f"  {'CSV fields':<14}{', '.join(top_csv)}")
+        for window in ('1y', '3y'):
+            timed(f"rescore on {window} NAV metrics", lambda: analyzer.set_score_window(window, BENCHMARK))
+            print(f"  {window:<14}{', '.join(f['id'] for f in analyzer.get_top_funds('large_cap'))}")
+    shutil.rmtree(STORE_DIR, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
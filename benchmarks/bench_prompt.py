@@ -0,0 +1,195 @@
+"""Benchmark the compact, budgeted analysis prompt against the verbose one.
+
+Builds the prompt for a handful of profiles with full advanced_analysis
+(projections and portfolio analytics) and reports prompt size, estimated
+tokens and build time for the original per-fund block format and for
+prompt_builder.
+
+    python benchmarks/bench_prompt.py --repeat 2000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from mutual_fund_analyzer import MutualFundAnalyzer, build_user_info  # noqa: E402
+from prompt_builder import PROMPT_TOKEN_BUDGET, PromptBuilder, SYSTEM_PROMPT, estimate_tokens  # noqa: E402
+
+PROFILES = [
+    {'risk_tolerance': 'low', 'investment_horizon': '1-3', 'investment_goal': 'tax_saving',
+     'investment_amount': 200000, 'monthly_sip': 10000},
+    {'risk_tolerance': 'moderate', 'investment_horizon': '5-10', 'investment_amount': 50000,
+     'monthly_sip': 5000},
+    {'risk_tolerance': 'high', 'investment_horizon': '10+', 'investment_amount': 1000000,
+     'monthly_sip': 25000, 'esg_preference': 'prefer_esg'},
+]
+
+
+def legacy_prompt(user_info, fund_data):
+    """The verbose per-fund prompt, as _create_analysis_prompt built it before"""
+
+    # Enhanced user profile information
+    user_profile = f"""
+User Profile:
+- Name: {user_info.get('name', 'User')}
+- Age: {user_info.get('age', 0)} years
+- Annual Income: ₹{user_info.get('annual_income', 0):,.0f}
+- Investment Amount: ₹{user_info.get('investment_amount', 0):,.0f}
+- Risk Appetite: {user_info.get('risk_tolerance', 'moderate').title()}
+- Investment Goal: {user_info.get('investment_goal', 'wealth_creation').replace('_', ' ').title()}
+- Investment Horizon: {user_info.get('investment_horizon', '5-10')} years
+- Monthly SIP Budget: ₹{user_info.get('monthly_sip', 0):,.0f}
+- Existing Investments: ₹{user_info.get('existing_investments', 0):,.0f}
+- Tax Bracket: {user_info.get('tax_bracket', 20)}%
+- Emergency Fund: {user_info.get('emergency_fund', 'yes').title()}
+- Fund Type Preference: {user_info.get('fund_type_preference', 'direct').title()}
+- ESG Preference: {user_info.get('esg_preference', 'no_preference').replace('_', ' ').title()}
+- Dividend vs Growth: {user_info.get('dividend_preference', 'growth').title()}
+"""
+
+    # Enhanced fund recommendations
+    fund_recommendations = "Recommended Funds:\n"
+    for category, funds in fund_data.get('recommendations', {}).items():
+        fund_recommendations += f"\n{category.replace('_', ' ').title()}:\n"
+        for i, fund in enumerate(funds, 1):
+            fund_recommendations += f"""
+{i}. {fund['name']}
+   - Fund Manager: {fund['fund_manager']}
+   - AUM: ₹{fund['aum_cr']:,.1f} Cr
+   - Expense Ratio: {fund['expense_ratio']}%
+   - 5Y SIP Return: {fund['sip_5yr_return']}%
+   - 10Y SIP Return: {fund['sip_10yr_return']}%
+   - Alpha: {fund['alpha']}
+   - Beta: {fund['beta']}
+   - Sharpe Ratio: {fund['sharpe_ratio']}
+   - Sortino Ratio: {fund['sortino_ratio']}
+   - ESG Score: {fund.get('esg_score', 'N/A')}/10
+   - Volatility: {fund.get('volatility_rank', 'moderate').title()}
+   - Peer Rank: {fund.get('peer_rank', 'N/A')}
+   - Risk-Adjusted Return: {fund.get('risk_adjusted_return', 'N/A')}%
+   - Diversification Score: {fund.get('diversification_score', 'N/A')}/100
+"""
+
+    # Advanced analysis data
+    advanced_analysis = fund_data.get('advanced_analysis', {})
+    advanced_info = ""
+
+    if advanced_analysis.get('projections'):
+        proj = advanced_analysis['projections']
+        advanced_info += f"""
+Investment Projections:
+- Monthly SIP: ₹{proj.get('monthly_sip', 0):,.0f}
+- Total Investment: ₹{proj.get('total_investment', 0):,.0f}
+- Projected Value: ₹{proj.get('projected_value', 0):,.0f}
+- Expected Return: {proj.get('expected_return', 0)}%
+- Time Period: {proj.get('time_period', 0)} years
+"""
+        if proj.get('monte_carlo'):
+            mc = proj['monte_carlo']
+            advanced_info += f"""- Simulated Range (P10 / P50 / P90): ₹{mc.get('p10', 0):,.0f} / ₹{mc.get('p50', 0):,.0f} / ₹{mc.get('p90', 0):,.0f}
+- Chance of Ending Below Amount Invested: {mc.get('probability_of_loss', 0)}%
+"""
+
+    if advanced_analysis.get('diversification_score'):
+        div = advanced_analysis['diversification_score']
+        advanced_info += f"""
+Portfolio Diversification:
+- Score: {div.get('score', 0)}/150
+- Categories: {div.get('categories', 0)}
+- Total Funds: {div.get('total_funds', 0)}
+- Assessment: {div.get('assessment', 'N/A')}
+"""
+
+    if advanced_analysis.get('expense_impact'):
+        exp = advanced_analysis['expense_impact']
+        advanced_info += f"""
+Expense Impact Analysis:
+- Average Expense Ratio: {exp.get('average_expense_ratio', 0)}%
+- Total Expense Over Period: ₹{exp.get('total_expense_over_period', 0):,.0f}
+- Potential Savings: ₹{exp.get('potential_savings', 0):,.0f}
+- Assessment: {exp.get('impact_assessment', 'N/A')}
+"""
+
+    if advanced_analysis.get('volatility_analysis'):
+        vol = advanced_analysis['volatility_analysis']
+        advanced_info += f"""
+Volatility Analysis:
+- Volatility Breakdown: Low: {vol.get('volatility_breakdown', {}).get('low', 0)}, Moderate: {vol.get('volatility_breakdown', {}).get('moderate', 0)}, High: {vol.get('volatility_breakdown', {}).get('high', 0)}
+- High Volatility Percentage: {vol.get('high_volatility_percentage', 0):.1f}%
+- Risk Assessment: {vol.get('risk_assessment', 'N/A')}
+"""
+
+    if advanced_analysis.get('risk_warnings'):
+        warnings = advanced_analysis['risk_warnings']
+        advanced_info += f"""
+Risk Warnings:
+{chr(10).join(f"- {warning}" for warning in warnings)}
+"""
+
+    prompt = f"""
+{user_profile}
+
+{fund_recommendations}
+
+{advanced_info}
+
+Please provide a comprehensive analysis including:
+
+1. **Executive Summary**: Brief overview of the investment strategy
+2. **Risk Assessment**: Detailed risk analysis considering user's profile and selected funds
+3. **Portfolio Analysis**: Analysis of diversification, expense impact, and volatility
+4. **Investment Strategy**: Specific recommendations based on user's goals and preferences
+5. **Key Insights**: Important considerations and next steps
+6. **Risk Warnings**: Any specific risks the user should be aware of
+
+Consider the user's:
+- Investment goal and horizon
+- Risk tolerance and existing investments
+- Tax bracket and emergency fund status
+- ESG and dividend preferences
+- Advanced metrics like ESG scores, volatility rankings, and peer comparisons
+
+Provide actionable, personalized advice that helps the user make informed investment decisions.
+"""
+
+    return prompt
+
+
+def time_per_call(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=2000)
+    parser.add_argument('--budget', type=int, default=PROMPT_TOKEN_BUDGET)
+    args = parser.parse_args()
+
+    analyzer = MutualFundAnalyzer()
+    builder = PromptBuilder(token_budget=args.budget)
+    print(f"{'profile':<28}{'legacy chars':>13}{'~tokens':>9}{'build us':>10}"
+          f"{'compact chars':>15}{'~tokens':>9}{'build us':>10}  dropped")
+    for data in PROFILES:
+        user_info = build_user_info(data)
+        fund_data = analyzer.get_recommendations(user_info)
+
+        legacy = f"{SYSTEM_PROMPT}\n\n{legacy_prompt(user_info, fund_data)}"
+        legacy_time = time_per_call(lambda: legacy_prompt(user_info, fund_data), args.repeat)
+        build = builder.build(user_info, fund_data)
+        compact = f"{build.prefix}\n{build.body}"
+        compact_time = time_per_call(lambda: builder.build(user_info, fund_data), args.repeat)
+
+        label = f"{user_info['risk_tolerance']}/{user_info['investment_horizon']}/{user_info['investment_goal']}"
+        print(f"{label:<28}{len(legacy):>13}{estimate_tokens(legacy):>9}{legacy_time * 1e6:>10.1f}"
+              f"{len(compact):>15}{build.tokens:>9}{compact_time * 1e6:>10.1f}  {', '.join(build.dropped) or '-'}")
+    print(f"static prefix: ~{builder.prefix_tokens} tokens, identical for every request")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""Benchmark vectorized fund scoring against the original row-wise apply.
+
+Builds a synthetic universe by tiling data/funds_sample.csv with jittered
+metrics, checks that get_top_funds returns exactly what the row-wise
+implementation returned, and reports per-call latency for both.
+
+    python benchmarks/bench_scoring.py --rows 15000 --repeat 20
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from fund_record import grow_url  # noqa: E402
+from mutual_fund_analyzer import DATA_PATH, MutualFundAnalyzer  # noqa: E402
+
+
+def legacy_top_funds(analyzer, category='large_cap', top_n=5):
+    df = analyzer.funds.copy()
+    if category and category in df['category'].unique():
+        df = df[df['category'] == category]
+    if df.empty: return []
+    df['score'] = df.apply(analyzer.score_fund, axis=1)
+    funds = df.sort_values('score', ascending=False, kind='stable').head(top_n).to_dict(orient='records')
+    for fund in funds:
+        fund['grow_url'] = grow_url(fund['name'])
+    return funds
+
+
+def build_universe(rows, seed=7):
+    base = pd.read_csv(DATA_PATH)
+    rng = np.random.default_rng(seed)
+    df = base.iloc[np.arange(rows) % len(base)].reset_index(drop=True)
+    df['id'] = [f"F{i:06d}" for i in range(rows)]
+    for column in ('sip_5yr_return', 'sharpe_ratio', 'expense_ratio', 'alpha'):
+        df[column] = (df[column] * rng.uniform(0.8, 1.2, rows)).round(4)
+    return df
+
+
+def timeit(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=15000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "funds.csv"
+        build_universe(args.rows).to_csv(path, index=False)
+        analyzer = MutualFundAnalyzer(path)
+
+    categories = list(analyzer.funds['category'].unique()) + [None, 'unknown']
+    for category in categories:
+        for top_n in (2, 5):
+            expected = legacy_top_funds(analyzer, category, top_n)
+            actual = analyzer.get_top_funds(category, top_n)
+            assert actual == expected, f"mismatch for category={category!r} top_n={top_n}"
+    print(f"OK: results match for {len(categories)} categories on {args.rows} rows")
+
+    for category in ('large_cap', None):
+        legacy_ms = timeit(lambda: legacy_top_funds(analyzer, category), args.repeat)
+        new_ms = timeit(lambda: analyzer.get_top_funds(category), args.repeat)
+        print(f"category={category!s:<10} row-wise apply: {legacy_ms:9.2f} ms  "
+              f"get_top_funds: {new_ms:7.3f} ms  speedup: {legacy_ms / new_ms:7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
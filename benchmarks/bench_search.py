@@ -0,0 +1,104 @@
+"""Benchmark indexed /funds/search against plain DataFrame filtering.
+
+Runs a set of representative queries through fund_search (after building
+the index once) and through pandas boolean masks + sort_values on the
+same snapshot, checks that both return the same fund ids in the same
+order, walks one query page by page with cursors, and reports per-query
+latency.
+
+    python benchmarks/bench_search.py --rows 15000 --repeat 50
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from bench_scoring import build_universe, timeit  # noqa: E402
+from fund_search import parse_query  # noqa: E402
+from mutual_fund_analyzer import MutualFundAnalyzer  # noqa: E402
+
+QUERIES = [
+    {},
+    {'category': 'debt', 'max_expense_ratio': '0.5', 'sort': 'sharpe_ratio'},
+    {'min_esg_score': '7', 'volatility_rank': 'low,moderate', 'sort': 'expense_ratio', 'order': 'asc'},
+    {'name': 'hdfc', 'sort': 'sip_5yr_return'},
+    {'name': 'ax', 'max_min_investment': '500'},
+    {'min_investment': '500', 'sort': 'returns_3y'},
+    {'fund_manager': 'Chirag Setalvad', 'min_sharpe_ratio': '1.2', 'max_sharpe_ratio': '1.6'},
+    {'category': 'large_cap,mid_cap', 'min_esg_score': '6.5', 'min_expense_ratio': '0.4',
+     'max_expense_ratio': '0.9', 'sort': 'aum_cr', 'limit': '100'},
+]
+
+
+def pandas_search(frame, params, fields, limit=None):
+    """The same query with DataFrame masks; returns (total, page ids)"""
+    query = parse_query(params, fields)
+    filters = query['filters']
+    mask = np.ones(len(frame), dtype=bool)
+    for field, values in filters['in'].items():
+        mask &= frame[field].astype(str).str.strip().str.lower().isin(values).to_numpy()
+    for field, (low, high) in filters['range'].items():
+        column = frame[field]
+        if low is not None:
+            mask &= (column >= low).to_numpy()
+        if high is not None:
+            mask &= (column <= high).to_numpy()
+        mask &= column.notna().to_numpy()
+    if filters.get('name'):
+        mask &= frame['name'].str.lower().str.contains(filters['name'].lower(), regex=False).to_numpy()
+    result = frame[mask].sort_values([query['sort'], 'id'], ascending=[not query['descending'], True],
+                                     kind='stable', na_position='last')
+    return int(mask.sum()), result['id'].head(limit or query['limit']).tolist()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=15000)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "funds.csv"
+        build_universe(args.rows).to_csv(path, index=False)
+        analyzer = MutualFundAnalyzer(path)
+
+    snapshot = analyzer.snapshot
+    frame = snapshot.funds.assign(score=snapshot.scores)
+    start = time.perf_counter()
+    fields = analyzer.search_fields()
+    print(f"{args.rows} funds, index build {(time.perf_counter() - start) * 1000:.1f} ms\n")
+
+    print(f"{'query':<70}{'matches':>8}{'indexed ms':>12}{'pandas ms':>11}{'speedup':>9}")
+    for params in QUERIES:
+        query = parse_query(params, fields)
+        result = analyzer.search_funds(query)
+        total, ids = pandas_search(frame, params, fields)
+        assert result['total'] == total, (params, result['total'], total)
+        assert [f['id'] for f in result['funds']] == ids, params
+        indexed = timeit(lambda: analyzer.search_funds(parse_query(params, fields)), args.repeat)
+        legacy = timeit(lambda: pandas_search(frame, params, fields), args.repeat)
+        label = '&'.join(f"{k}={v}" for k, v in params.items()) or '(all, by score)'
+        print(f"{label[:68]:<70}{total:>8}{indexed:>12.3f}{legacy:>11.3f}{legacy / indexed:>8.1f}x")
+
+    # Cursor pages must concatenate to the full sorted result
+    params = {'category': 'debt', 'sort': 'expense_ratio', 'order': 'asc', 'limit': '100'}
+    total, expected = pandas_search(frame, params, fields, limit=len(frame))
+    seen, cursor = [], None
+    while True:
+        page = analyzer.search_funds(parse_query(dict(params, **({'cursor': cursor} if cursor else {})), fields))
+        seen.extend(f['id'] for f in page['funds'])
+        cursor = page['next_cursor']
+        if not cursor:
+            break
+    assert seen == expected
+    print(f"\ncursor walk: {len(seen)} funds in {-(-total // 100)} pages, identical to the pandas order")
+
+
+if __name__ == '__main__':
+    main()
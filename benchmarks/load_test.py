@@ -0,0 +1,172 @@
+"""Load test for /analyze, /top-funds and the analyzer hot paths.
+
+Drives each target at every concurrency level for a fixed number of
+requests and prints one JSON document with p50/p95/p99 latency and
+requests per second, so runs can be saved and diffed across commits.
+
+By default the app runs in-process (Flask test client) with the stub LLM
+backend and the response cache off, so every /analyze call pays the
+simulated model latency. Pass --url to drive a running server instead
+(start it with LLM_BACKEND=stub to keep Gemini out of the loop).
+
+    python benchmarks/load_test.py --concurrency 1 8 32 --requests 200 -o load.json
+    python benchmarks/load_test.py --url http://127.0.0.1:8000 --targets analyze top-funds
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+PROFILES = [
+    {'risk_tolerance': 'low', 'investment_horizon': '1-3', 'investment_goal': 'tax_saving',
+     'investment_amount': 200000, 'monthly_sip': 10000},
+    {'risk_tolerance': 'moderate', 'investment_horizon': '5-10', 'investment_amount': 50000,
+     'monthly_sip': 5000},
+    {'risk_tolerance': 'high', 'investment_horizon': '10+', 'investment_amount': 1000000,
+     'monthly_sip': 25000},
+]
+CATEGORIES = ('large_cap', 'mid_cap', 'small_cap', 'flexi_cap', 'debt')
+TARGETS = ('analyze', 'top-funds', 'get-recommendations', 'get-top-funds')
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(int(round(pct / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def make_calls(args):
+    """target name -> callable(i) that performs request i and returns success"""
+    if args.url:
+        def post(path, payload):
+            request = urllib.request.Request(args.url.rstrip('/') + path, data=json.dumps(payload).encode(),
+                                             headers={'Content-Type': 'application/json'})
+            with urllib.request.urlopen(request, timeout=120) as response:
+                response.read()
+                return response.status == 200
+        return {
+            'analyze': lambda i: post('/analyze', PROFILES[i % len(PROFILES)]),
+            'top-funds': lambda i: post('/top-funds', {'category': CATEGORIES[i % len(CATEGORIES)]}),
+        }
+
+    import app as app_module
+    from mutual_fund_analyzer import build_user_info
+
+    client = app_module.app.test_client()
+    analyzer = app_module.get_analyzer()
+    user_infos = [build_user_info(p) for p in PROFILES]
+    return {
+        'analyze': lambda i: client.post('/analyze', json=PROFILES[i % len(PROFILES)]).status_code == 200,
+        'top-funds': lambda i: client.post('/top-funds',
+                                           json={'category': CATEGORIES[i % len(CATEGORIES)]}).status_code == 200,
+        'get-recommendations': lambda i: bool(analyzer.get_recommendations(user_infos[i % len(user_infos)])),
+        'get-top-funds': lambda i: bool(analyzer.get_top_funds(CATEGORIES[i % len(CATEGORIES)])),
+    }
+
+
+def run_level(call, concurrency, requests, warmup):
+    for i in range(warmup):
+        call(i)
+
+    def timed_call(i):
+        start = time.perf_counter()
+        try:
+            ok = call(i)
+        except Exception:
+            ok = False
+        return time.perf_counter() - start, ok
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        samples = list(pool.map(timed_call, range(requests)))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(seconds * 1000 for seconds, _ in samples)
+    return {
+        'concurrency': concurrency,
+        'requests': requests,
+        'errors': sum(1 for _, ok in samples if not ok),
+        'seconds': round(elapsed, 4),
+        'rps': round(requests / elapsed, 2),
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'mean_ms': round(sum(latencies) / len(latencies), 3),
+        'max_ms': round(latencies[-1], 3),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--targets', nargs='+', choices=TARGETS, default=list(TARGETS))
+    parser.add_argument('--concurrency', nargs='+', type=int, default=[1, 8, 32])
+    parser.add_argument('--requests', type=int, default=200, help="requests per target and level")
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--url', help="drive a running server instead of the in-process app")
+    parser.add_argument('--stub-latency', type=float, default=0.05, help="seconds per simulated LLM call")
+    parser.add_argument('--stub-error-rate', type=float, default=0.0)
+    parser.add_argument('--stub-response-chars', type=int, default=3000)
+    parser.add_argument('--cache', action='store_true', help="keep the LLM response cache on")
+    parser.add_argument('-o', '--output', help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    stub = {'LLM_BACKEND': 'stub', 'LLM_STUB_LATENCY': str(args.stub_latency),
+            'LLM_STUB_ERROR_RATE': str(args.stub_error_rate),
+            'LLM_STUB_RESPONSE_CHARS': str(args.stub_response_chars)}
+    if not args.url:
+        # Set before the app (and its lazily created LLM client) is imported
+        for name, value in stub.items():
+            os.environ.setdefault(name, value)
+        os.environ.setdefault('LLM_CACHE', 'memory' if args.cache else 'off')
+        os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+    calls = make_calls(args)
+    results = []
+    for target in args.targets:
+        if target not in calls:
+            print(f"skipping {target}: only available in-process", file=sys.stderr)
+            continue
+        for concurrency in args.concurrency:
+            result = run_level(calls[target], concurrency, args.requests, args.warmup)
+            result['target'] = target
+            results.append(result)
+            print(f"{target:<20} c={concurrency:<4} {result['rps']:>9.1f} rps  p50 {result['p50_ms']:.1f} ms  "
+                  f"p99 {result['p99_ms']:.1f} ms  errors {result['errors']}", file=sys.stderr)
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'mode': 'http' if args.url else 'in-process',
+        'url': args.url,
+        'llm': {name: os.getenv(name) for name in list(stub) + ['LLM_CACHE']} if not args.url else None,
+        'results': results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding='utf-8')
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+"""Columnar binary cache of the fund CSV.
+
+The first load parses the CSV with pandas and writes each column next to it
+(or under the temp dir when the data dir is read-only) as a .npy file:
+numeric columns keep their dtype, string columns are interned into a string
+table plus int32 codes. Later loads memory-map those arrays and never import
+pandas. The manifest records a SHA-256 of the CSV bytes, so any
+edit to the source invalidates the cache.
+
+    python fund_cache.py data/funds_sample.csv   # prebuild at deploy time
+"""
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+from instrumentation import get_logger
+
+log = get_logger('fund_cache')
+
+CACHE_VERSION = 1
+CACHE_ENABLED = os.getenv('FUND_CACHE', '1') != '0'
+
+
+def cache_dir_for(data_path) -> Path:
+    """FUND_CACHE_DIR, else next to the CSV, else the temp dir on read-only deploys"""
+    data_path = Path(data_path)
+    base = os.getenv('FUND_CACHE_DIR')
+    if base:
+        return Path(base) / f".{data_path.stem}.cache"
+    local = data_path.parent / f".{data_path.stem}.cache"
+    if local.is_dir() or os.access(data_path.parent, os.W_OK):
+        return local
+    # App Engine and Vercel mount the app read-only; /tmp is writable per instance
+    return Path(tempfile.gettempdir()) / f".{data_path.stem}.cache"
+
+
+def source_digest(data_path) -> str:
+    digest = hashlib.sha256()
+    with open(data_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_csv_columns(data_path) -> Dict[str, np.ndarray]:
+    """Parse the CSV with pandas into a dict of column arrays"""
+    import pandas as pd
+
+    df = pd.read_csv(data_path)
+    return {name: df[name].to_numpy() for name in df.columns}
+
+
+def load_cached_columns(data_path, digest: str) -> Optional[Dict[str, np.ndarray]]:
+    """Memory-map the cached columns, or None if the cache is missing or stale"""
+    cache_dir = cache_dir_for(data_path)
+    try:
+        with open(cache_dir / "manifest.json", encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get('version') != CACHE_VERSION or manifest.get('source_sha256') != digest:
+        return None
+
+    columns = {}
+    try:
+        for column in manifest['columns']:
+            values = np.load(cache_dir / column['file'], mmap_mode='r', allow_pickle=False)
+            if column['kind'] == 'string':
+                # Code -1 marks an empty cell, which pandas reads as NaN
+                table = np.array(column['strings'] + [float('nan')], dtype=object)
+                values = table[values]
+            columns[column['name']] = values
+    except (OSError, ValueError, KeyError):
+        return None
+    return columns
+
+
+def write_cached_columns(data_path, digest: str, columns: Dict[str, np.ndarray]) -> bool:
+    """Write the column cache; returns False if a column cannot be cached.
+
+    Other processes may have the published columns memory-mapped, so no
+    file they can see is rewritten in place: each column goes to a temp
+    file that replaces its final name, and the manifest is published last.
+    """
+    if load_cached_columns(data_path, digest) is not None:
+        return True  # another process already published this digest
+    cache_dir = cache_dir_for(data_path)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    prefix = digest[:16]
+
+    entries = []
+    for i, (name, values) in enumerate(columns.items()):
+        entry = {'name': name, 'file': f"{prefix}_{i}.npy"}
+        if values.dtype.kind in 'biuf':
+            entry['kind'] = 'numeric'
+            payload = np.ascontiguousarray(values)
+        elif values.dtype.kind == 'O':
+            items = values.tolist()
+            if any(not isinstance(v, str) and v == v for v in items):
+                return False  # mixed types: let pandas handle it every time
+            strings = {}
+            codes = np.fromiter(
+                (strings.setdefault(v, len(strings)) if isinstance(v, str) else -1 for v in items),
+                dtype=np.int32, count=len(items))
+            entry['kind'] = 'string'
+            entry['strings'] = list(strings)
+            payload = codes
+        else:
+            return False
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.npy.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.save(f, payload, allow_pickle=False)
+            os.replace(tmp_path, cache_dir / entry['file'])
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+        entries.append(entry)
+
+    manifest = {'version': CACHE_VERSION, 'source_sha256': digest,
+                'source': Path(data_path).name, 'columns': entries}
+    # Publish the manifest last and atomically; readers only follow the manifest
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.json.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, cache_dir / "manifest.json")
+
+    for stale in cache_dir.glob("*.npy"):
+        if not stale.name.startswith(prefix):
+            stale.unlink(missing_ok=True)
+    return True
+
+
+def load_columns(data_path) -> Dict[str, np.ndarray]:
+    """Columns of the fund CSV, from the binary cache when it is fresh"""
+    if not CACHE_ENABLED:
+        return read_csv_columns(data_path)
+    digest = source_digest(data_path)
+    columns = load_cached_columns(data_path, digest)
+    if columns is not None:
+        return columns
+    columns = read_csv_columns(data_path)
+    try:
+        write_cached_columns(data_path, digest, columns)
+    except OSError as e:
+        log.warning("Could not write fund cache: %s", e)
+    return columns
+
+
+if __name__ == '__main__':
+    for path in sys.argv[1:] or [Path(__file__).parent / "data" / "funds_sample.csv"]:
+        columns = read_csv_columns(path)
+        if write_cached_columns(path, source_digest(path), columns):
+            print(f"OK: wrote {cache_dir_for(path)}")
+        else:
+            print(f"WARNING: {path} has columns that cannot be cached")
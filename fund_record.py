@@ -0,0 +1,90 @@
+"""Compact, immutable fund records shared across requests.
+
+A FundSnapshot builds one FundRecord per fund at load time. A record is a
+read-only Mapping over a tuple of values; the field -> position map is
+shared by every record of the snapshot, so a record costs one small object
+and one tuple instead of a 22-key dict. grow_url is computed once here
+rather than per request.
+
+Because records are never mutated, request handlers pass the snapshot's
+records around directly instead of copying them. json_default turns them
+into plain dicts for json.dumps / the Flask JSON provider, and
+prompt_cells caches a record's row in the LLM prompt fund table.
+"""
+import re
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, Sequence, Tuple
+
+
+def grow_url(fund_name) -> str:
+    safe_name = re.sub(r'\s+', '+', str(fund_name).strip())
+    return f"https://www.google.com/search?q={safe_name}+mutual+fund"
+
+
+class FundRecord(Mapping):
+    __slots__ = ('_positions', '_values', '_prompt')
+
+    def __init__(self, positions: Dict[str, int], values: Tuple[Any, ...]):
+        self._positions = positions
+        self._values = values
+        self._prompt = None
+
+    def __getitem__(self, key):
+        return self._values[self._positions[key]]
+
+    def get(self, key, default=None):
+        position = self._positions.get(key)
+        return default if position is None else self._values[position]
+
+    def __contains__(self, key):
+        return key in self._positions
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._positions)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def keys(self):
+        return self._positions.keys()
+
+    def items(self):
+        return zip(self._positions, self._values)
+
+    def values(self):
+        return self._values
+
+    def as_dict(self) -> Dict[str, Any]:
+        return dict(zip(self._positions, self._values))
+
+    def prompt_cells(self, fields: Sequence[str]) -> Tuple[str, ...]:
+        """' | value' cells for the prompt fund table, built once per field list"""
+        cached = self._prompt
+        if cached is None or cached[0] is not fields:
+            cached = (fields, tuple(f" | {self.get(field, '-')}" for field in fields))
+            self._prompt = cached
+        return cached[1]
+
+    def __reduce__(self):
+        return FundRecord, (self._positions, self._values)
+
+    def __repr__(self):
+        return f"FundRecord({self.as_dict()!r})"
+
+
+def make_records(names: Sequence[str], rows) -> Tuple[FundRecord, ...]:
+    """Records for value rows ordered like names, with grow_url appended"""
+    positions = {name: i for i, name in enumerate(names)}
+    if 'grow_url' in positions:
+        return tuple(FundRecord(positions, tuple(row)) for row in rows)
+    positions['grow_url'] = len(positions)
+    name_at = positions.get('name')
+    return tuple(FundRecord(positions, tuple(row) + (grow_url(row[name_at] if name_at is not None else ''),))
+                 for row in rows)
+
+
+def json_default(value):
+    """json.dumps default= hook for FundRecord"""
+    if isinstance(value, FundRecord):
+        return value.as_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
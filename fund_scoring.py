@@ -0,0 +1,82 @@
+import numpy as np
+from typing import Dict, Iterable, Optional
+
+# Columns used by the scoring formula, with the fallback applied when a value
+# cannot be parsed as a number (mirrors MutualFundAnalyzer._safe_to_float).
+SCORE_DEFAULTS = {
+    'sip_5yr_return': 0.0,
+    'sharpe_ratio': 0.0,
+    'expense_ratio': 2.0,
+    'alpha': 0.0,
+}
+
+# Scoring columns that NAV history can supply (see nav_history), by metric name
+HISTORY_SCORE_FIELDS = {
+    'sip_5yr_return': 'sip_return',
+    'sharpe_ratio': 'sharpe_ratio',
+    'alpha': 'alpha',
+}
+
+
+def _to_float(value, default):
+    try: return float(value)
+    except (ValueError, TypeError): return default
+
+
+def coerce_numeric_columns(columns: Dict[str, np.ndarray],
+                           defaults: Dict[str, float] = SCORE_DEFAULTS) -> Dict[str, np.ndarray]:
+    """Coerce the scoring columns to float64 arrays once.
+
+    Unparseable values and missing columns take the column default, while
+    genuinely empty cells stay NaN, exactly like the row-wise float() calls.
+    """
+    coerced = {}
+    for name, default in defaults.items():
+        values = columns.get(name)
+        if values is None:
+            length = len(next(iter(columns.values()))) if columns else 0
+            coerced[name] = np.full(length, default, dtype=np.float64)
+        elif values.dtype.kind in 'biuf':
+            coerced[name] = np.array(values, dtype=np.float64)
+        else:
+            coerced[name] = np.fromiter((_to_float(v, default) for v in values.tolist()),
+                                        dtype=np.float64, count=len(values))
+    return coerced
+
+
+def apply_score_overrides(columns: Dict[str, np.ndarray],
+                          overrides: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Replace scoring inputs with override values wherever those are not NaN"""
+    merged = dict(columns)
+    for name, values in overrides.items():
+        if name in merged:
+            merged[name] = np.where(np.isnan(values), merged[name], values)
+    return merged
+
+
+def score_funds(columns: Dict[str, np.ndarray]) -> np.ndarray:
+    """Weighted fund score for every row in one vectorized pass."""
+    returns_score = columns['sip_5yr_return'] * 0.4
+    risk_adjusted_score = columns['sharpe_ratio'] * 10 * 0.25
+    expense_score = (2 - columns['expense_ratio']) * 0.15
+    alpha_score = columns['alpha'] * 0.2
+    return returns_score + risk_adjusted_score + expense_score + alpha_score
+
+
+def rank_indices(scores: np.ndarray, candidates: Optional[np.ndarray] = None) -> np.ndarray:
+    """Row indices ordered by descending score, NaN scores last, ties by row order."""
+    if candidates is None:
+        candidates = np.arange(len(scores))
+    values = scores[candidates]
+    nan_mask = np.isnan(values)
+    order = np.lexsort((candidates, nan_mask, -np.where(nan_mask, 0.0, values)))
+    return candidates[order]
+
+
+def category_positions(categories: Iterable) -> Dict[object, np.ndarray]:
+    """Map each category value to the row indices holding it."""
+    values = np.asarray(list(categories), dtype=object)
+    positions = {}
+    for category in dict.fromkeys(values.tolist()):
+        positions[category] = np.flatnonzero(values == category)
+    return positions
@@ -0,0 +1,251 @@
+"""Indexed search and filtering over the fund universe.
+
+A SearchIndex is built once per fund snapshot (on the first search after a
+load):
+
+- every numeric column gets an ascending and a descending row order with
+  ties broken by fund id, and the sorted key arrays for range lookups
+  (np.searchsorted), so a min/max filter is two binary searches
+- category, volatility_rank and fund_manager get inverted indexes
+  (lower-cased value -> row indices)
+- names get a trigram index; a substring query intersects the posting
+  lists of its trigrams and then verifies the few candidates
+
+Filters combine as boolean row masks. Sorting never sorts at request time:
+the precomputed order for the sort field is filtered by the mask. Cursors
+are keyset cursors (last sort value + fund id), so pages stay consistent
+when the data is reloaded between requests.
+"""
+import base64
+import json
+import threading
+from typing import Any, Dict, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from fund_scoring import category_positions
+
+CATEGORICAL_FIELDS = ('category', 'volatility_rank', 'fund_manager')
+NGRAM = 3
+DEFAULT_SORT = 'score'
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+
+def _trigrams(text: str):
+    return {text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1)}
+
+
+def _lower(value) -> str:
+    return value.strip().lower() if isinstance(value, str) else ''
+
+
+class SearchIndex:
+    def __init__(self, snapshot):
+        columns = snapshot.columns
+        self.records = snapshot.records
+        self.size = len(self.records)
+        ids = columns['id'].tolist() if 'id' in columns else [f"{i:08d}" for i in range(self.size)]
+        self.ids = np.array([str(i) for i in ids])
+
+        # Numeric columns (plus the snapshot score) for range filters and sorting
+        numeric = {name: np.asarray(values, dtype=np.float64) for name, values in columns.items()
+                   if values.dtype.kind in 'biuf'}
+        numeric['score'] = np.asarray(snapshot.scores, dtype=np.float64)
+        self.numeric_fields = tuple(numeric)
+        self.orders = {}   # (field, descending) -> row order, NaN last, ties by id
+        self.sorted_keys = {}  # (field, descending) -> key values in that order
+        for name, values in numeric.items():
+            for descending in (False, True):
+                key = -values if descending else values
+                order = np.lexsort((self.ids, key))
+                self.orders[name, descending] = order
+                self.sorted_keys[name, descending] = key[order]
+
+        self.inverted = {}
+        for field in CATEGORICAL_FIELDS:
+            if field in columns:
+                lowered = np.array([_lower(v) for v in columns[field].tolist()], dtype=object)
+                self.inverted[field] = category_positions(lowered)
+
+        names = columns['name'].tolist() if 'name' in columns else [''] * self.size
+        self.names = [_lower(name) for name in names]
+        postings = {}
+        for row, name in enumerate(self.names):
+            for gram in _trigrams(name):
+                postings.setdefault(gram, []).append(row)
+        self.ngrams = {gram: np.array(rows, dtype=np.intp) for gram, rows in postings.items()}
+
+    def range_rows(self, field: str, low: Optional[float], high: Optional[float]) -> np.ndarray:
+        """Rows with low <= value <= high (either bound optional), via the ascending keys"""
+        keys = self.sorted_keys[field, False]
+        start = 0 if low is None else np.searchsorted(keys, low, side='left')
+        # NaNs sort last; an open upper bound must still exclude them
+        stop = (np.searchsorted(keys, np.inf, side='right') if high is None
+                else np.searchsorted(keys, high, side='right'))
+        return self.orders[field, False][start:stop]
+
+    def name_rows(self, query: str) -> np.ndarray:
+        query = query.lower()
+        if len(query) < NGRAM:
+            return np.array([row for row, name in enumerate(self.names) if query in name], dtype=np.intp)
+        postings = []
+        for gram in _trigrams(query):
+            rows = self.ngrams.get(gram)
+            if rows is None:
+                return np.empty(0, dtype=np.intp)
+            postings.append(rows)
+        postings.sort(key=len)
+        candidates = postings[0]
+        for rows in postings[1:]:
+            candidates = np.intersect1d(candidates, rows, assume_unique=True)
+            if not len(candidates):
+                break
+        # Trigrams can all match without the substring matching
+        return np.array([row for row in candidates.tolist() if query in self.names[row]], dtype=np.intp)
+
+    def search(self, filters: Mapping[str, Any], sort: str = DEFAULT_SORT, descending: bool = True,
+               limit: int = DEFAULT_LIMIT, after: Optional[Tuple[float, str]] = None) -> Dict[str, Any]:
+        if (sort, descending) not in self.orders:
+            raise ValueError(f"Cannot sort by {sort!r}; expected one of {', '.join(self.numeric_fields)}")
+        mask = np.ones(self.size, dtype=bool)
+
+        def restrict(rows):
+            selected = np.zeros(self.size, dtype=bool)
+            selected[rows] = True
+            np.logical_and(mask, selected, out=mask)
+
+        for field, values in filters.get('in', {}).items():
+            index = self.inverted.get(field, {})
+            rows = [index[v] for v in values if v in index]
+            restrict(np.concatenate(rows) if rows else np.empty(0, dtype=np.intp))
+        for field, (low, high) in filters.get('range', {}).items():
+            if field not in self.numeric_fields:
+                raise ValueError(f"Cannot filter on {field!r}; expected one of {', '.join(self.numeric_fields)}")
+            restrict(self.range_rows(field, low, high))
+        if filters.get('name'):
+            restrict(self.name_rows(filters['name']))
+
+        order = self.orders[sort, descending]
+        start = 0
+        if after is not None:
+            # Keyset: first position strictly after (value, id) in this order
+            value, last_id = after
+            key = -value if descending else value
+            keys = self.sorted_keys[sort, descending]
+            low = np.searchsorted(keys, key, side='left')
+            high = np.searchsorted(keys, key, side='right')
+            start = low + np.searchsorted(self.ids[order[low:high]], last_id, side='right')
+        matched = order[start:][mask[order[start:]]]
+        page = matched[:limit].tolist()
+
+        next_cursor = None
+        if len(matched) > limit:
+            last = page[-1]
+            next_cursor = encode_cursor(sort, descending, self._value(sort, last), str(self.ids[last]))
+        return {
+            'total': int(mask.sum()),
+            'funds': [self.records[row] for row in page],
+            'next_cursor': next_cursor,
+        }
+
+    def _value(self, field: str, row: int) -> Optional[float]:
+        value = self.records[row].get(field)
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            return None
+        return None if value != value else value
+
+
+def encode_cursor(sort: str, descending: bool, value: Optional[float], fund_id: str) -> str:
+    payload = json.dumps([sort, int(descending), value, fund_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[str, bool, float, str]:
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        sort, descending, value, fund_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return sort, bool(descending), float('nan') if value is None else float(value), str(fund_id)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+
+def parse_query(params: Mapping[str, str], numeric_fields: Sequence[str] = ()) -> Dict[str, Any]:
+    """Search arguments from request parameters.
+
+    category, volatility_rank, fund_manager: comma-separated, case-insensitive
+    name: case-insensitive substring
+    <field>: exact match on a numeric column (e.g. min_investment=500)
+    min_<field> / max_<field>: inclusive bounds on any numeric column
+    sort (default score), order (asc or desc, default desc), limit, cursor
+
+    numeric_fields are the index's columns; a key that is itself a column
+    name is never read as a min_/max_ prefix.
+    """
+    filters = {'in': {}, 'range': {}}
+    for field in CATEGORICAL_FIELDS:
+        if params.get(field):
+            filters['in'][field] = [_lower(v) for v in params[field].split(',') if v.strip()]
+    if params.get('name'):
+        filters['name'] = params['name'].strip()
+    for key, raw in params.items():
+        if raw in (None, ''):
+            continue
+        if key in numeric_fields:
+            field, slots = key, (0, 1)
+        elif key.startswith('min_'):
+            field, slots = key[len('min_'):], (0,)
+        elif key.startswith('max_'):
+            field, slots = key[len('max_'):], (1,)
+        else:
+            continue
+        try:
+            bound = float(raw)
+        except ValueError:
+            raise ValueError(f"{key} must be a number")
+        current = list(filters['range'].get(field, (None, None)))
+        for slot in slots:
+            current[slot] = bound
+        filters['range'][field] = tuple(current)
+
+    order = params.get('order', 'desc').lower()
+    if order not in ('asc', 'desc'):
+        raise ValueError("order must be asc or desc")
+    try:
+        limit = min(max(int(params.get('limit', DEFAULT_LIMIT)), 1), MAX_LIMIT)
+    except ValueError:
+        raise ValueError("limit must be an integer")
+    query = {'filters': filters, 'sort': params.get('sort', DEFAULT_SORT), 'descending': order == 'desc',
+             'limit': limit, 'after': None}
+    if params.get('cursor'):
+        sort, descending, value, fund_id = decode_cursor(params['cursor'])
+        if (sort, descending) != (query['sort'], query['descending']):
+            raise ValueError("cursor does not match the requested sort")
+        query['after'] = (value, fund_id)
+    return query
+
+
+class FundSearch:
+    """Holds the SearchIndex for one snapshot; rebuilt lazily on snapshot change"""
+
+    def __init__(self):
+        self._state = (None, None)
+        self._lock = threading.Lock()
+
+    def index(self, snapshot) -> SearchIndex:
+        built_for, index = self._state
+        if built_for is not snapshot:
+            with self._lock:
+                built_for, index = self._state
+                if built_for is not snapshot:
+                    index = SearchIndex(snapshot)
+                    self._state = (snapshot, index)
+        return index
+
+    def numeric_fields(self, snapshot) -> Tuple[str, ...]:
+        return self.index(snapshot).numeric_fields
+
+    def search(self, snapshot, query: Mapping[str, Any]) -> Dict[str, Any]:
+        return self.index(snapshot).search(**query)
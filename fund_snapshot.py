@@ -0,0 +1,99 @@
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from fund_cache import load_columns
+from fund_record import FundRecord, make_records
+from fund_scoring import apply_score_overrides, coerce_numeric_columns, score_funds, rank_indices, category_positions
+from instrumentation import timed
+
+
+def data_signature(data_path) -> Tuple[int, int]:
+    """Cheap change detector for the data file: (mtime_ns, size)"""
+    stat = os.stat(data_path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+class FundSnapshot:
+    """Immutable, fully indexed view of one version of the fund universe.
+
+    A snapshot is built completely before it is published, and never changed
+    afterwards, so request handlers can keep using the one they started with
+    while a newer snapshot is swapped in.
+    """
+
+    __slots__ = ('columns', 'scores', 'records', 'ranked_all', 'ranked_by_category',
+                 'signature', 'history_signature', 'loaded_at', '_frame')
+
+    def __init__(self, columns: Dict[str, np.ndarray], signature: Optional[Tuple[int, int]] = None,
+                 history=None):
+        self.columns = columns
+        self.signature = signature
+        self.loaded_at = time.time()
+        self._frame = None
+
+        # Coerce the scoring columns and score every fund once, at load time.
+        # With NAV history scoring (nav_history.HistoryScoring), metrics for
+        # the chosen window replace the CSV fields they cover.
+        with timed('fund_scoring'):
+            inputs = coerce_numeric_columns(columns)
+            self.history_signature = None
+            if history is not None and 'id' in columns:
+                self.history_signature = history.signature()
+                inputs = apply_score_overrides(inputs, history.score_overrides(columns['id'].tolist()))
+            self.scores = score_funds(inputs)
+            self.scores.setflags(write=False)
+
+        # Immutable records shared by every request, and pre-sorted record
+        # lists per category so top-N lookups are a slice. tolist() yields the
+        # same native Python values as DataFrame.to_dict.
+        names = list(columns) + ['score']
+        values = [columns[name].tolist() for name in columns] + [self.scores.tolist()]
+        records = make_records(names, zip(*values))
+        self.records = records
+        self.ranked_all = tuple(records[i] for i in rank_indices(self.scores))
+        self.ranked_by_category = {
+            category: tuple(records[i] for i in rank_indices(self.scores, rows))
+            for category, rows in category_positions(columns['category']).items()
+        }
+
+    @classmethod
+    def load(cls, data_path, history=None) -> 'FundSnapshot':
+        # Take the signature first: if the file changes mid-read, the next
+        # check sees a newer signature and loads it again.
+        signature = data_signature(data_path)
+        with timed('fund_load'):
+            columns = load_columns(data_path)
+        return cls(columns, signature, history)
+
+    def is_current(self, data_path, history=None) -> bool:
+        """False once the data file, the NAV history or the scoring window changed"""
+        if data_signature(data_path) != self.signature:
+            return False
+        return self.history_signature == (history.signature() if history is not None else None)
+
+    @property
+    def funds(self):
+        """The snapshot as a pandas DataFrame, built on first access"""
+        if self._frame is None:
+            import pandas as pd
+            self._frame = pd.DataFrame({name: np.asarray(values) for name, values in self.columns.items()})
+        return self._frame
+
+    def ranked(self, category: Optional[str]) -> Tuple[FundRecord, ...]:
+        ranked = self.ranked_by_category.get(category) if category else None
+        return self.ranked_all if ranked is None else ranked
+
+    def top_funds(self, category: Optional[str], top_n: int) -> List[FundRecord]:
+        return list(self.ranked(category)[:top_n])
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            'funds': len(self.ranked_all),
+            'categories': len(self.ranked_by_category),
+            'mtime_ns': self.signature[0] if self.signature else None,
+            'size': self.signature[1] if self.signature else None,
+            'loaded_at': self.loaded_at,
+        }
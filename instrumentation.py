@@ -0,0 +1,173 @@
+"""Lightweight logging, timing and Prometheus-style metrics.
+
+Logging goes through the standard logging module with a QueueHandler, so a
+request thread only enqueues a record; a background listener does the
+actual stderr write. Messages below LOG_LEVEL (default INFO) are dropped
+by the level check before any formatting happens, so debug logging is
+close to free when disabled.
+
+Metrics are plain in-process counters and fixed-bucket histograms rendered
+in the Prometheus text format by render_metrics(). Under gunicorn every
+worker keeps its own registry; scrape each worker or aggregate upstream.
+"""
+import atexit
+import bisect
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Dict, Iterable, List, Optional, Tuple
+
+LOGGER_NAME = 'mf_advisor'
+
+# Upper bounds (seconds) for stage latency histograms: 100us .. 60s
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 45.0, 60.0)
+
+_logging_lock = threading.Lock()
+_listener = None
+
+
+def _configure_logging():
+    global _listener
+    with _logging_lock:
+        if _listener is not None:
+            return
+        root = logging.getLogger(LOGGER_NAME)
+        root.setLevel(os.getenv('LOG_LEVEL', 'INFO').upper())
+        root.propagate = False
+        stream_handler = logging.StreamHandler(sys.stderr)
+        stream_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+        log_queue = queue.SimpleQueue()
+        root.addHandler(logging.handlers.QueueHandler(log_queue))
+        _listener = logging.handlers.QueueListener(log_queue, stream_handler)
+        _listener.start()
+        atexit.register(_listener.stop)
+
+
+def get_logger(name: str) -> logging.Logger:
+    _configure_logging()
+    return logging.getLogger(f"{LOGGER_NAME}.{name}")
+
+
+def _label_key(labelnames: Tuple[str, ...], labels: Dict[str, str]) -> Tuple[str, ...]:
+    return tuple(str(labels.get(name, '')) for name in labelnames)
+
+
+def _format_labels(labelnames: Iterable[str], values: Iterable[str], extra: str = '') -> str:
+    parts = [f'{name}="{value}"' for name, value in zip(labelnames, values)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(_label_key(self.labelnames, labels), 0.0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value:g}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = _label_key(self.labelnames, labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # per-bucket counts (+Inf last), sum, count
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((key, [list(s[0]), s[1], s[2]]) for key, s in self._series.items())
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else f"{bound:g}"
+                labels = _format_labels(self.labelnames, key, 'le="%s"' % le)
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {total:.6f}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+STAGE_LATENCY = Histogram('mf_stage_latency_seconds', "Latency of hot-path stages.", ('stage',))
+LLM_REQUESTS = Counter('mf_llm_requests_total',
+                       "LLM analyses by outcome (ok, fallback, cache_hit).", ('outcome',))
+LLM_CACHE_LOOKUPS = Counter('mf_llm_cache_lookups_total', "LLM response cache lookups.", ('result',))
+FUND_RELOADS = Counter('mf_fund_reloads_total', "Fund snapshot reloads by result.", ('result',))
+PROMPT_TOKENS = Histogram('mf_llm_prompt_tokens', "Estimated input tokens per LLM prompt.",
+                          buckets=(250, 500, 750, 1000, 1500, 2000, 3000, 5000))
+
+REGISTRY = [STAGE_LATENCY, LLM_REQUESTS, LLM_CACHE_LOOKUPS, FUND_RELOADS, PROMPT_TOKENS]
+
+
+@contextmanager
+def timed(stage: str):
+    """Record the wall time of a block in the stage latency histogram"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_LATENCY.observe(time.perf_counter() - start, stage=stage)
+
+
+def timed_stage(stage: str):
+    """Decorator form of timed()"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                STAGE_LATENCY.observe(time.perf_counter() - start, stage=stage)
+        return wrapper
+    return decorator
+
+
+def render_metrics(extra: Optional[List[str]] = None) -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    if extra:
+        lines.extend(extra)
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,137 @@
+"""LLM backends behind LLMRecommender.
+
+A backend builds the model object that AsyncLLMClient drives: anything with
+an async generate_content_async(prompt, generation_config=..., stream=...,
+request_options=...) returning an object with .text (or, with stream=True,
+an async iterator of such chunks), which is the google-generativeai API.
+
+- gemini: the real Gemini API (the SDK is imported only here)
+- stub: an in-process stand-in with configurable latency, error rate and
+  response size, for load tests and local runs without an API key
+
+    LLM_BACKEND=stub LLM_STUB_LATENCY=1.5 LLM_STUB_ERROR_RATE=0.05 gunicorn app:app
+"""
+import asyncio
+import inspect
+import json
+import os
+import random
+from typing import Any, Optional
+
+MODEL_NAME = 'gemini-pro'
+
+STUB_SECTIONS = ('Executive Summary', 'Risk Assessment', 'Portfolio Analysis', 'Investment Strategy',
+                 'Key Insights', 'Risk Warnings')
+STUB_SENTENCE = ("It is important to note that a diversified SIP across the recommended categories, "
+                 "reviewed once a year, keeps the portfolio aligned with the stated goal. ")
+
+
+class StubLLMError(RuntimeError):
+    """Injected failure from the stub backend"""
+
+
+class GeminiBackend:
+    name = 'gemini'
+
+    def __init__(self, model_name: str = MODEL_NAME):
+        import google.generativeai as genai
+
+        genai.configure(api_key=os.getenv('GOOGLE_API_KEY'))
+        self._genai = genai
+        self.model_name = model_name
+        # Newer SDKs can constrain output to JSON and take a system instruction
+        self.supports_json_mime = 'response_mime_type' in inspect.signature(genai.types.GenerationConfig).parameters
+        self.supports_system_instruction = 'system_instruction' in inspect.signature(genai.GenerativeModel).parameters
+
+    def model(self, system_instruction: Optional[str] = None):
+        if system_instruction and self.supports_system_instruction:
+            return self._genai.GenerativeModel(self.model_name, system_instruction=system_instruction)
+        return self._genai.GenerativeModel(self.model_name)
+
+
+class _StubResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class _StubStream:
+    def __init__(self, chunks, delay: float):
+        self._chunks = iter(chunks)
+        self._delay = delay
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            chunk = next(self._chunks)
+        except StopIteration:
+            raise StopAsyncIteration
+        await asyncio.sleep(self._delay)
+        return _StubResponse(chunk)
+
+
+class StubModel:
+    def __init__(self, backend: 'StubBackend'):
+        self.backend = backend
+
+    def _text(self, generation_config) -> str:
+        # About response_chars of text: the six sections, one bullet per sentence
+        per_section = max(self.backend.response_chars // len(STUB_SECTIONS), 1)
+        bullets = max(per_section // len(STUB_SENTENCE), 1)
+        if (generation_config or {}).get('response_mime_type') == 'application/json':
+            data = {heading.lower().replace(' ', '_'): STUB_SENTENCE * bullets for heading in STUB_SECTIONS}
+            data['key_insights'] = [STUB_SENTENCE.strip()] * bullets
+            return json.dumps(data)
+        body = "\n".join(f"- {STUB_SENTENCE.strip()}" for _ in range(bullets))
+        return "\n\n".join(f"**{heading}:**\n{body}" for heading in STUB_SECTIONS)
+
+    async def generate_content_async(self, prompt, generation_config=None, stream: bool = False,
+                                     request_options: Any = None, **kwargs):
+        backend = self.backend
+        latency = backend.sample_latency()
+        if backend.rng.random() < backend.error_rate:
+            await asyncio.sleep(latency / 2)
+            raise StubLLMError("injected stub failure")
+        text = self._text(generation_config)
+        if not stream:
+            await asyncio.sleep(latency)
+            return _StubResponse(text)
+        # Same total latency, spread over the chunks like a real token stream
+        chunks = [text[i:i + backend.chunk_chars] for i in range(0, len(text), backend.chunk_chars)]
+        return _StubStream(chunks, latency / max(len(chunks), 1))
+
+
+class StubBackend:
+    name = 'stub'
+    supports_json_mime = True
+    supports_system_instruction = True
+
+    def __init__(self, latency: float = None, jitter: float = None, error_rate: float = None,
+                 response_chars: int = None, chunk_chars: int = 200, seed: Optional[int] = None):
+        self.model_name = 'stub'
+        self.latency = float(os.getenv('LLM_STUB_LATENCY', 1.0)) if latency is None else latency
+        self.jitter = float(os.getenv('LLM_STUB_JITTER', 0.2)) if jitter is None else jitter
+        self.error_rate = float(os.getenv('LLM_STUB_ERROR_RATE', 0.0)) if error_rate is None else error_rate
+        self.response_chars = (int(os.getenv('LLM_STUB_RESPONSE_CHARS', 3000)) if response_chars is None
+                               else response_chars)
+        self.chunk_chars = chunk_chars
+        self.rng = random.Random(seed)
+
+    def sample_latency(self) -> float:
+        # Uniform jitter as a fraction of the base latency
+        return max(self.latency * (1 + self.jitter * (2 * self.rng.random() - 1)), 0.0)
+
+    def model(self, system_instruction: Optional[str] = None):
+        return StubModel(self)
+
+
+BACKENDS = {'gemini': GeminiBackend, 'stub': StubBackend}
+
+
+def make_backend(name: Optional[str] = None):
+    """Backend from LLM_BACKEND (gemini by default)"""
+    name = (name or os.getenv('LLM_BACKEND', 'gemini')).lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown LLM_BACKEND {name!r}; expected one of {', '.join(BACKENDS)}")
+    return BACKENDS[name]()
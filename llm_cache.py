@@ -0,0 +1,173 @@
+"""Content-addressed cache for parsed LLM analyses.
+
+Keys are a SHA-256 over the canonical JSON of everything that determines the
+model output (model name, generation config, full prompt). Because the
+prompt embeds the recommended funds, any fund data change produces new keys
+and old entries simply age out.
+
+Backends:
+- MemoryResponseCache: per-process LRU with TTL
+- SQLiteResponseCache: file-backed, shared by all gunicorn workers on a host
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+DEFAULT_TTL = float(os.getenv('LLM_CACHE_TTL', 6 * 3600))
+DEFAULT_MAX_ENTRIES = int(os.getenv('LLM_CACHE_MAX_ENTRIES', 1024))
+
+
+def cache_key(*parts: Any) -> str:
+    canonical = json.dumps(parts, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class _CacheStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def record(self, hit: bool):
+        with self._lock:
+            if hit: self.hits += 1
+            else: self.misses += 1
+
+    def evicted(self, count: int):
+        if count:
+            with self._lock:
+                self.evictions += count
+
+    def as_dict(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+class MemoryResponseCache:
+    """In-process LRU cache with a per-entry TTL"""
+
+    backend = 'memory'
+
+    def __init__(self, ttl: float = DEFAULT_TTL, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = _CacheStats()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+        self._stats.record(entry is not None)
+        # Values are stored serialized, so every hit gets its own copy
+        return json.loads(entry[1]) if entry is not None else None
+
+    def set(self, key: str, value: Dict[str, Any]):
+        payload = json.dumps(value, ensure_ascii=False)
+        evicted = 0
+        with self._lock:
+            self._entries[key] = (time.time() + self.ttl, payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+        self._stats.evicted(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {'backend': self.backend, 'entries': len(self._entries), **self._stats.as_dict()}
+
+
+class SQLiteResponseCache:
+    """SQLite-backed LRU cache with TTL, safe to share between processes"""
+
+    backend = 'sqlite'
+
+    def __init__(self, path, ttl: float = DEFAULT_TTL, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = str(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._stats = _CacheStats()
+        with self._connection() as conn:
+            conn.execute("""CREATE TABLE IF NOT EXISTS responses (
+                                key TEXT PRIMARY KEY,
+                                value TEXT NOT NULL,
+                                expires_at REAL NOT NULL,
+                                accessed_at REAL NOT NULL)""")
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread; sqlite3 connections are not thread-safe
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        conn = self._connection()
+        row = conn.execute("SELECT value, expires_at FROM responses WHERE key = ?", (key,)).fetchone()
+        with conn:
+            if row is not None and row[1] <= now:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                row = None
+            elif row is not None:
+                conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        self._stats.record(row is not None)
+        return json.loads(row[0]) if row is not None else None
+
+    def set(self, key: str, value: Dict[str, Any]):
+        now = time.time()
+        conn = self._connection()
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO responses (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                         (key, json.dumps(value, ensure_ascii=False), now + self.ttl, now))
+            conn.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+            cursor = conn.execute("""DELETE FROM responses WHERE key IN (
+                                         SELECT key FROM responses ORDER BY accessed_at DESC
+                                         LIMIT -1 OFFSET ?)""", (self.max_entries,))
+        self._stats.evicted(max(cursor.rowcount, 0))
+
+    def clear(self):
+        with self._connection() as conn:
+            conn.execute("DELETE FROM responses")
+
+    def stats(self) -> Dict[str, Any]:
+        entries = self._connection().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {'backend': self.backend, 'entries': entries, **self._stats.as_dict()}
+
+
+def make_response_cache():
+    """Build the cache selected by LLM_CACHE (memory, sqlite or off)"""
+    backend = os.getenv('LLM_CACHE', 'memory').lower()
+    if backend in ('off', 'none', '0', ''):
+        return None
+    if backend == 'sqlite':
+        path = os.getenv('LLM_CACHE_PATH') or os.path.join(tempfile.gettempdir(), 'mf_advisor_llm_cache.sqlite3')
+        return SQLiteResponseCache(path)
+    return MemoryResponseCache()
@@ -1,220 +1,230 @@
-import google.generativeai as genai
 import os
-from typing import Dict, List, Any
+from typing import Dict, Iterator, List, Any, Optional, Tuple
 import json
 
+from async_llm import AsyncLLMClient
+from llm_backends import make_backend
+from instrumentation import LLM_CACHE_LOOKUPS, LLM_REQUESTS, get_logger, timed
+from llm_cache import cache_key, make_response_cache
+from llm_response import extract_key_insights, parse_analysis
+from prompt_builder import PromptBuilder
+
+log = get_logger('llm')
+
+GENERATION_CONFIG = {'max_output_tokens': 1500, 'temperature': 0.7}
+
+# LLM_JSON_MODE=1 asks the model for a JSON object instead of free text
+JSON_MODE = os.getenv('LLM_JSON_MODE', '0') == '1'
+
+# Profile fields rounded before prompting, so similar users share cache entries
+AMOUNT_FIELDS = ('annual_income', 'investment_amount', 'monthly_sip', 'existing_investments')
+# Per-user rupee figures derived from the exact amounts; left out of cached prompts
+PROJECTION_AMOUNT_FIELDS = ('monthly_sip', 'total_investment', 'projected_value')
+MONTE_CARLO_AMOUNT_FIELDS = ('p10', 'p50', 'p90')
+EXPENSE_AMOUNT_FIELDS = ('total_expense_over_period', 'potential_savings')
+
+
+def _round_significant(value, digits=2):
+    try: value = float(value)
+    except (ValueError, TypeError): return 0
+    if value <= 0: return 0
+    return int(float(f"{value:.{digits}g}"))
+
+
+def normalize_profile(user_info: Dict[str, Any]) -> Dict[str, Any]:
+    """Bucket a user profile: drop the name, round amounts and age"""
+    profile = dict(user_info)
+    profile['name'] = 'Investor'
+    for field in AMOUNT_FIELDS:
+        if field in profile:
+            profile[field] = _round_significant(profile[field])
+    try: profile['age'] = int(float(profile.get('age', 0))) // 5 * 5
+    except (ValueError, TypeError): profile['age'] = 0
+    return profile
+
+
+def normalize_fund_data(fund_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Keep only percentage-level figures in advanced_analysis.
+
+    Projections and expense amounts come from the exact investment amounts,
+    so rounding them still splits the cache across profiles that only
+    differ in amount; the prompt keeps returns, horizon and ratios instead.
+    """
+    advanced = fund_data.get('advanced_analysis')
+    if not advanced:
+        return fund_data
+    advanced = dict(advanced)
+    if advanced.get('projections'):
+        projections = {k: v for k, v in advanced['projections'].items() if k not in PROJECTION_AMOUNT_FIELDS}
+        if projections.get('monte_carlo'):
+            monte_carlo = {k: v for k, v in projections['monte_carlo'].items()
+                           if k not in MONTE_CARLO_AMOUNT_FIELDS}
+            if 'probability_of_loss' in monte_carlo:
+                monte_carlo['probability_of_loss'] = round(monte_carlo['probability_of_loss'] / 5) * 5
+            projections['monte_carlo'] = monte_carlo
+        advanced['projections'] = projections
+    if advanced.get('expense_impact'):
+        advanced['expense_impact'] = {k: v for k, v in advanced['expense_impact'].items()
+                                      if k not in EXPENSE_AMOUNT_FIELDS}
+    return dict(fund_data, advanced_analysis=advanced)
+
+
 class LLMRecommender:
-    def __init__(self):
-        genai.configure(api_key=os.getenv('GOOGLE_API_KEY'))
-        self.model = genai.GenerativeModel('gemini-pro')
+    def __init__(self, cache=None, json_mode: Optional[bool] = None, backend=None):
+        # Gemini unless LLM_BACKEND says otherwise (see llm_backends)
+        self.backend = backend if backend is not None else make_backend()
+        self.json_mode = JSON_MODE if json_mode is None else json_mode
+        self.prompt_builder = PromptBuilder(json_mode=self.json_mode)
+        self.model = self.backend.model(system_instruction=self.prompt_builder.prefix)
+        self.client = AsyncLLMClient(self.model)
+        # Cache of parsed analyses; LLM_CACHE=off disables it
+        self.cache = cache if cache is not None else make_response_cache()
+        # Older SDKs cannot constrain output to JSON; the prompt still asks for it
+        self.generation_config = dict(GENERATION_CONFIG)
+        if self.json_mode and self.backend.supports_json_mime:
+            self.generation_config['response_mime_type'] = 'application/json'
         
-    def generate_recommendations(self, user_info: Dict[str, Any], fund_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Generate personalized investment recommendations using LLM"""
+    def generate_recommendations(self, user_info: Dict[str, Any], fund_data: Dict[str, Any],
+                                 deadline: Optional[float] = None, fallback: bool = True) -> Dict[str, Any]:
+        """Generate personalized investment recommendations using LLM
+
+        deadline is an absolute time.monotonic() value; if the model has not
+        answered by then, the call is cancelled and the rule-based fallback
+        is returned instead. With fallback=False the error is raised, so
+        callers such as the batch runner can retry.
+        """
         
-        # Create a comprehensive prompt for the LLM
-        prompt = self._create_analysis_prompt(user_info, fund_data)
+        full_prompt, key = self._prepare_prompt(user_info, fund_data)
+        cached = self._cache_lookup(key)
+        if cached is not None:
+            LLM_REQUESTS.inc(outcome='cache_hit')
+            return self._assemble_analysis(cached, user_info, fund_data)
         
         try:
-            # Create system prompt and user prompt
-            system_prompt = """You are an expert financial advisor specializing in mutual fund investments in India. 
-            You provide personalized, well-reasoned investment advice based on user profiles and fund data. 
-            Always consider risk tolerance, investment horizon, and financial goals. 
-            Be conservative and emphasize the importance of diversification."""
-            
-            full_prompt = f"{system_prompt}\n\n{prompt}"
-            
-            response = self.model.generate_content(
-                full_prompt,
-                generation_config=genai.types.GenerationConfig(
-                    max_output_tokens=1500,
-                    temperature=0.7
+            with timed('llm_call'):
+                analysis = self.client.generate(
+                    full_prompt,
+                    self.generation_config,
+                    deadline=deadline
                 )
-            )
-            
-            analysis = response.text
             
             # Parse the analysis into structured format
-            structured_analysis = self._parse_llm_response(analysis, user_info, fund_data)
-            
-            return structured_analysis
+            with timed('llm_parse'):
+                structured_analysis = self._parse_llm_response(analysis, user_info, fund_data)
             
         except Exception as e:
+            if not fallback:
+                LLM_REQUESTS.inc(outcome='error')
+                raise
             # Fallback to rule-based recommendations if LLM fails
+            LLM_REQUESTS.inc(outcome='fallback')
+            log.warning("LLM analysis failed, using fallback: %r", e)
             return self._generate_fallback_recommendations(user_info, fund_data)
-    
-    def _create_analysis_prompt(self, user_info: Dict[str, Any], fund_data: Dict[str, Any]) -> str:
-        """Create a comprehensive prompt for LLM analysis"""
         
-        # Enhanced user profile information
-        user_profile = f"""
-User Profile:
-- Name: {user_info.get('name', 'User')}
-- Age: {user_info.get('age', 0)} years
-- Annual Income: ₹{user_info.get('annual_income', 0):,.0f}
-- Investment Amount: ₹{user_info.get('investment_amount', 0):,.0f}
-- Risk Appetite: {user_info.get('risk_tolerance', 'moderate').title()}
-- Investment Goal: {user_info.get('investment_goal', 'wealth_creation').replace('_', ' ').title()}
-- Investment Horizon: {user_info.get('investment_horizon', '5-10')} years
-- Monthly SIP Budget: ₹{user_info.get('monthly_sip', 0):,.0f}
-- Existing Investments: ₹{user_info.get('existing_investments', 0):,.0f}
-- Tax Bracket: {user_info.get('tax_bracket', 20)}%
-- Emergency Fund: {user_info.get('emergency_fund', 'yes').title()}
-- Fund Type Preference: {user_info.get('fund_type_preference', 'direct').title()}
-- ESG Preference: {user_info.get('esg_preference', 'no_preference').replace('_', ' ').title()}
-- Dividend vs Growth: {user_info.get('dividend_preference', 'growth').title()}
-"""
-
-        # Enhanced fund recommendations
-        fund_recommendations = "Recommended Funds:\n"
-        for category, funds in fund_data.get('recommendations', {}).items():
-            fund_recommendations += f"\n{category.replace('_', ' ').title()}:\n"
-            for i, fund in enumerate(funds, 1):
-                fund_recommendations += f"""
-{i}. {fund['name']}
-   - Fund Manager: {fund['fund_manager']}
-   - AUM: ₹{fund['aum_cr']:,.1f} Cr
-   - Expense Ratio: {fund['expense_ratio']}%
-   - 5Y SIP Return: {fund['sip_5yr_return']}%
-   - 10Y SIP Return: {fund['sip_10yr_return']}%
-   - Alpha: {fund['alpha']}
-   - Beta: {fund['beta']}
-   - Sharpe Ratio: {fund['sharpe_ratio']}
-   - Sortino Ratio: {fund['sortino_ratio']}
-   - ESG Score: {fund.get('esg_score', 'N/A')}/10
-   - Volatility: {fund.get('volatility_rank', 'moderate').title()}
-   - Peer Rank: {fund.get('peer_rank', 'N/A')}
-   - Risk-Adjusted Return: {fund.get('risk_adjusted_return', 'N/A')}%
-   - Diversification Score: {fund.get('diversification_score', 'N/A')}/100
-"""
+        LLM_REQUESTS.inc(outcome='ok')
+        self._cache_store(key, structured_analysis)
+        return structured_analysis
+    
+    def stream_recommendations(self, user_info: Dict[str, Any], fund_data: Dict[str, Any],
+                               deadline: Optional[float] = None) -> Iterator[Tuple[str, Any]]:
+        """Streaming variant of generate_recommendations
 
-        # Advanced analysis data
-        advanced_analysis = fund_data.get('advanced_analysis', {})
-        advanced_info = ""
+        Yields ('token', text) for each chunk the model sends, then exactly one
+        ('analysis', structured_analysis). Cache hits yield the cached text as
+        a single token; failures and deadline expiry yield the fallback.
+        """
+        full_prompt, key = self._prepare_prompt(user_info, fund_data)
+        cached = self._cache_lookup(key)
+        if cached is not None:
+            LLM_REQUESTS.inc(outcome='cache_hit')
+            analysis = self._assemble_analysis(cached, user_info, fund_data)
+            yield 'token', analysis['sections'].get('full_analysis', '')
+            yield 'analysis', analysis
+            return
         
-        if advanced_analysis.get('projections'):
-            proj = advanced_analysis['projections']
-            advanced_info += f"""
-Investment Projections:
-- Monthly SIP: ₹{proj.get('monthly_sip', 0):,.0f}
-- Total Investment: ₹{proj.get('total_investment', 0):,.0f}
-- Projected Value: ₹{proj.get('projected_value', 0):,.0f}
-- Expected Return: {proj.get('expected_return', 0)}%
-- Time Period: {proj.get('time_period', 0)} years
-"""
-
-        if advanced_analysis.get('diversification_score'):
-            div = advanced_analysis['diversification_score']
-            advanced_info += f"""
-Portfolio Diversification:
-- Score: {div.get('score', 0)}/150
-- Categories: {div.get('categories', 0)}
-- Total Funds: {div.get('total_funds', 0)}
-- Assessment: {div.get('assessment', 'N/A')}
-"""
-
-        if advanced_analysis.get('expense_impact'):
-            exp = advanced_analysis['expense_impact']
-            advanced_info += f"""
-Expense Impact Analysis:
-- Average Expense Ratio: {exp.get('average_expense_ratio', 0)}%
-- Total Expense Over Period: ₹{exp.get('total_expense_over_period', 0):,.0f}
-- Potential Savings: ₹{exp.get('potential_savings', 0):,.0f}
-- Assessment: {exp.get('impact_assessment', 'N/A')}
-"""
-
-        if advanced_analysis.get('volatility_analysis'):
-            vol = advanced_analysis['volatility_analysis']
-            advanced_info += f"""
-Volatility Analysis:
-- Volatility Breakdown: Low: {vol.get('volatility_breakdown', {}).get('low', 0)}, Moderate: {vol.get('volatility_breakdown', {}).get('moderate', 0)}, High: {vol.get('volatility_breakdown', {}).get('high', 0)}
-- High Volatility Percentage: {vol.get('high_volatility_percentage', 0):.1f}%
-- Risk Assessment: {vol.get('risk_assessment', 'N/A')}
-"""
-
-        if advanced_analysis.get('risk_warnings'):
-            warnings = advanced_analysis['risk_warnings']
-            advanced_info += f"""
-Risk Warnings:
-{chr(10).join(f"- {warning}" for warning in warnings)}
-"""
-
-        prompt = f"""
-{user_profile}
-
-{fund_recommendations}
-
-{advanced_info}
-
-Please provide a comprehensive analysis including:
-
-1. **Executive Summary**: Brief overview of the investment strategy
-2. **Risk Assessment**: Detailed risk analysis considering user's profile and selected funds
-3. **Portfolio Analysis**: Analysis of diversification, expense impact, and volatility
-4. **Investment Strategy**: Specific recommendations based on user's goals and preferences
-5. **Key Insights**: Important considerations and next steps
-6. **Risk Warnings**: Any specific risks the user should be aware of
-
-Consider the user's:
-- Investment goal and horizon
-- Risk tolerance and existing investments
-- Tax bracket and emergency fund status
-- ESG and dividend preferences
-- Advanced metrics like ESG scores, volatility rankings, and peer comparisons
-
-Provide actionable, personalized advice that helps the user make informed investment decisions.
-"""
-
-        return prompt
+        parts = []
+        try:
+            with timed('llm_stream'):
+                for text in self.client.stream(
+                    full_prompt,
+                    self.generation_config,
+                    deadline=deadline
+                ):
+                    parts.append(text)
+                    yield 'token', text
+            with timed('llm_parse'):
+                structured_analysis = self._parse_llm_response(''.join(parts), user_info, fund_data)
+        except Exception as e:
+            LLM_REQUESTS.inc(outcome='fallback')
+            log.warning("LLM stream failed, using fallback: %r", e)
+            yield 'analysis', self._generate_fallback_recommendations(user_info, fund_data)
+            return
+        
+        LLM_REQUESTS.inc(outcome='ok')
+        self._cache_store(key, structured_analysis)
+        yield 'analysis', structured_analysis
+    
+    def _prepare_prompt(self, user_info: Dict[str, Any], fund_data: Dict[str, Any]) -> Tuple[str, str]:
+        """Build the full prompt and its cache key"""
+        with timed('prompt_build'):
+            # With a cache, prompt with the bucketed profile so similar users share entries
+            if self.cache is not None:
+                build = self.prompt_builder.build(normalize_profile(user_info), normalize_fund_data(fund_data))
+            else:
+                build = self.prompt_builder.build(user_info, fund_data)
+            if build.dropped:
+                log.debug("Prompt over budget, dropped %s (~%d tokens)", ', '.join(build.dropped), build.tokens)
+            # The static prefix goes first (or in the system instruction) so it is identical across requests
+            if self.backend.supports_system_instruction:
+                full_prompt = build.body
+            else:
+                full_prompt = f"{build.prefix}\n{build.body}"
+            return full_prompt, cache_key(self.backend.model_name, self.generation_config, build.prefix, build.body)
+    
+    def _cache_lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        if self.cache is None:
+            return None
+        cached = self.cache.get(key)
+        LLM_CACHE_LOOKUPS.inc(result='hit' if cached is not None else 'miss')
+        return cached
+    
+    def _cache_store(self, key: str, structured_analysis: Dict[str, Any]):
+        if self.cache is not None:
+            # Only the profile-independent parts are cached; the rest is per user
+            self.cache.set(key, {
+                'sections': structured_analysis['sections'],
+                'key_insights': structured_analysis['key_insights'],
+            })
+    
+    def _assemble_analysis(self, cached: Dict[str, Any], user_info: Dict, fund_data: Dict) -> Dict[str, Any]:
+        """Combine a cached analysis with the per-user parts of the response"""
+        return {
+            'sections': cached['sections'],
+            'suggested_allocations': self._calculate_suggested_allocations(user_info, fund_data),
+            'summary': self._generate_summary(user_info, fund_data),
+            'key_insights': cached['key_insights']
+        }
+    
+    def _create_analysis_prompt(self, user_info: Dict[str, Any], fund_data: Dict[str, Any]) -> str:
+        """Per-request part of the analysis prompt (see prompt_builder)"""
+        return self.prompt_builder.build(user_info, fund_data).body
     
     def _parse_llm_response(self, analysis: str, user_info: Dict, fund_data: Dict) -> Dict[str, Any]:
         """Parse LLM response into structured format"""
         
-        # Extract key sections from the analysis
-        sections = {
-            'risk_assessment': self._extract_section(analysis, 'RISK ASSESSMENT'),
-            'portfolio_allocation': self._extract_section(analysis, 'PORTFOLIO ALLOCATION'),
-            'fund_analysis': self._extract_section(analysis, 'FUND SELECTION ANALYSIS'),
-            'investment_strategy': self._extract_section(analysis, 'INVESTMENT STRATEGY'),
-            'risk_warnings': self._extract_section(analysis, 'RISK WARNINGS'),
-            'next_steps': self._extract_section(analysis, 'NEXT STEPS'),
-            'full_analysis': analysis
-        }
+        # Sections and key insights in one pass (see llm_response)
+        parsed = parse_analysis(analysis, json_mode=self.json_mode)
         
         # Calculate suggested allocations based on fund data
         suggested_allocations = self._calculate_suggested_allocations(user_info, fund_data)
         
         return {
-            'sections': sections,
+            'sections': parsed['sections'],
             'suggested_allocations': suggested_allocations,
             'summary': self._generate_summary(user_info, fund_data),
-            'key_insights': self._extract_key_insights(analysis)
+            'key_insights': parsed['key_insights']
         }
     
-    def _extract_section(self, text: str, section_name: str) -> str:
-        """Extract a specific section from the LLM response"""
-        try:
-            start_marker = f"{section_name}:"
-            end_markers = ["RISK ASSESSMENT:", "PORTFOLIO ALLOCATION:", "FUND SELECTION ANALYSIS:", 
-                          "INVESTMENT STRATEGY:", "RISK WARNINGS:", "NEXT STEPS:"]
-            
-            start_idx = text.find(start_marker)
-            if start_idx == -1:
-                return ""
-            
-            start_idx += len(start_marker)
-            
-            # Find the next section marker
-            end_idx = len(text)
-            for marker in end_markers:
-                if marker != start_marker:
-                    marker_idx = text.find(marker, start_idx)
-                    if marker_idx != -1 and marker_idx < end_idx:
-                        end_idx = marker_idx
-            
-            return text[start_idx:end_idx].strip()
-        except:
-            return ""
-    
     def _calculate_suggested_allocations(self, user_info: Dict, fund_data: Dict) -> Dict[str, Any]:
         """Calculate suggested investment allocations"""
         
@@ -259,27 +269,7 @@ Provide actionable, personalized advice that helps the user make informed invest
     def _extract_key_insights(self, analysis: str) -> List[str]:
         """Extract key insights from the LLM analysis"""
         
-        insights = []
-        
-        # Look for key phrases that indicate important insights
-        key_phrases = [
-            "important to note",
-            "key consideration",
-            "recommend",
-            "suggest",
-            "consider",
-            "highlight",
-            "crucial",
-            "essential"
-        ]
-        
-        lines = analysis.split('\n')
-        for line in lines:
-            line = line.strip()
-            if any(phrase in line.lower() for phrase in key_phrases) and len(line) > 20:
-                insights.append(line)
-        
-        return insights[:5]  # Return top 5 insights
+        return extract_key_insights(analysis)
     
     def _generate_fallback_recommendations(self, user_info: Dict, fund_data: Dict) -> Dict[str, Any]:
         """Generate fallback recommendations if LLM fails"""
@@ -0,0 +1,134 @@
+"""Parsing of the LLM analysis into sections.
+
+Free-text responses are split with one compiled heading regex in a single
+pass: every heading the prompt asks for (plus the older upper-case markers)
+is matched wherever it starts a line, in any of the usual markdown forms
+("## Risk Assessment", "**2. Risk Assessment:**", "RISK ASSESSMENT:"), and
+each section runs to the next heading.
+
+With JSON mode the model is asked for a JSON object instead, and parsing is
+one json.loads plus validation; anything that does not validate falls back
+to the free-text parser.
+"""
+import json
+import re
+from typing import Any, Dict, List, Optional
+
+# Heading text (lower case) -> section key, in the order the prompt asks for them
+SECTION_HEADINGS = {
+    'executive summary': 'executive_summary',
+    'risk assessment': 'risk_assessment',
+    'portfolio analysis': 'portfolio_analysis',
+    'investment strategy': 'investment_strategy',
+    'key insights': 'key_insights',
+    'risk warnings': 'risk_warnings',
+    # Markers used by earlier prompts
+    'portfolio allocation': 'portfolio_allocation',
+    'fund selection analysis': 'fund_analysis',
+    'next steps': 'next_steps',
+}
+SECTION_KEYS = tuple(dict.fromkeys(SECTION_HEADINGS.values()))
+JSON_SECTION_KEYS = SECTION_KEYS[:6]
+
+_HEADING_NAMES = '|'.join(sorted((re.escape(h).replace(r'\ ', r'\s+') for h in SECTION_HEADINGS),
+                                 key=len, reverse=True))
+# A heading starts a line and is either followed by a colon or ends the line
+SECTION_PATTERN = re.compile(
+    r'^[ \t]*(?:#{1,6}[ \t]*)?(?:\*\*|__)?[ \t]*(?:\d+[.)][ \t]*)?(?:\*\*|__)?[ \t]*'
+    rf'(?P<heading>{_HEADING_NAMES})'
+    r'[ \t]*(?:\*\*|__)?[ \t]*(?::|(?=\r?\n|\Z))[ \t]*(?:\*\*|__)?',
+    re.IGNORECASE | re.MULTILINE,
+)
+BULLET_PATTERN = re.compile(r'^[ \t]*(?:[-*•]|\d+[.)])[ \t]+(?P<item>.+?)[ \t]*$', re.MULTILINE)
+KEY_PHRASE_PATTERN = re.compile(
+    r'^.*(?:important to note|key consideration|recommend|suggest|consider|highlight|crucial|essential).*$',
+    re.IGNORECASE | re.MULTILINE,
+)
+MAX_KEY_INSIGHTS = 5
+
+JSON_INSTRUCTIONS = """
+Respond with a single JSON object and nothing else, using exactly these keys:
+{"executive_summary": string, "risk_assessment": string, "portfolio_analysis": string,
+ "investment_strategy": string, "risk_warnings": string, "key_insights": [string, ...]}
+"""
+
+
+def _heading_key(heading: str) -> str:
+    return SECTION_HEADINGS[' '.join(heading.lower().split())]
+
+
+def split_sections(text: str) -> Dict[str, str]:
+    """Section key -> body for every known heading in the text.
+
+    Every key in SECTION_KEYS is present (empty when the heading is
+    missing); a heading that appears twice gets both bodies.
+    """
+    sections = dict.fromkeys(SECTION_KEYS, '')
+    matches = list(SECTION_PATTERN.finditer(text))
+    for match, following in zip(matches, matches[1:] + [None]):
+        end = following.start() if following is not None else len(text)
+        body = text[match.end():end].strip()
+        key = _heading_key(match.group('heading'))
+        if sections[key] and body:
+            sections[key] += "\n\n" + body
+        elif body:
+            sections[key] = body
+    return sections
+
+
+def extract_key_insights(text: str, sections: Optional[Dict[str, str]] = None) -> List[str]:
+    """Bullets of the Key Insights section, else lines with advice-like phrases"""
+    body = (sections or {}).get('key_insights', '')
+    insights = [m.group('item').strip('*_ ') for m in BULLET_PATTERN.finditer(body)]
+    if not insights:
+        insights = [line.strip() for line in KEY_PHRASE_PATTERN.findall(text)]
+    return [line for line in insights if len(line) > 20][:MAX_KEY_INSIGHTS]
+
+
+def _strip_code_fence(text: str) -> str:
+    text = text.strip()
+    if text.startswith('```'):
+        text = text.split('\n', 1)[1] if '\n' in text else ''
+        if text.rstrip().endswith('```'):
+            text = text.rstrip()[:-3]
+    return text
+
+
+def parse_json_analysis(text: str) -> Optional[Dict[str, Any]]:
+    """Sections and key insights from a JSON-mode response, or None if invalid"""
+    try:
+        data = json.loads(_strip_code_fence(text))
+    except ValueError:
+        return None
+    if not isinstance(data, dict):
+        return None
+    sections = dict.fromkeys(SECTION_KEYS, '')
+    for key in JSON_SECTION_KEYS:
+        value = data.get(key, '')
+        if isinstance(value, list):
+            value = '\n'.join(f"- {item}" for item in value if isinstance(item, str))
+        if not isinstance(value, str):
+            return None
+        sections[key] = value.strip()
+    insights = data.get('key_insights', [])
+    if isinstance(insights, str):
+        insights = [insights]
+    if not isinstance(insights, list) or not any(sections.values()):
+        return None
+    key_insights = [item.strip() for item in insights if isinstance(item, str) and item.strip()]
+    # Keep a readable text version for the UI and the cache
+    sections['full_analysis'] = '\n\n'.join(
+        f"{key.replace('_', ' ').title()}:\n{sections[key]}" for key in JSON_SECTION_KEYS if sections[key])
+    return {'sections': sections, 'key_insights': key_insights[:MAX_KEY_INSIGHTS]}
+
+
+def parse_analysis(text: str, json_mode: bool = False) -> Dict[str, Any]:
+    """{'sections': {...}, 'key_insights': [...]} for a raw model response"""
+    if json_mode:
+        parsed = parse_json_analysis(text)
+        if parsed is not None:
+            return parsed
+    sections = split_sections(text)
+    key_insights = extract_key_insights(text, sections)
+    sections['full_analysis'] = text
+    return {'sections': sections, 'key_insights': key_insights}
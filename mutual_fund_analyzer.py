@@ -1,24 +1,140 @@
-import pandas as pd
-import numpy as np
-import re
 from pathlib import Path
 import os
+import threading
+import time
+
+from allocation_planner import ALLOCATION_TABLE, AllocationPlanner, profile_bucket
+from fund_record import grow_url
+from fund_search import FundSearch
+from fund_scoring import HISTORY_SCORE_FIELDS
+from fund_snapshot import FundSnapshot
+from payload_cache import TopFundsPayloads
+from instrumentation import FUND_RELOADS, get_logger, timed, timed_stage
+from nav_history import HistoryScoring, NavHistory
+from portfolio_analytics import PortfolioAnalytics
+from projections import project_portfolio
+
+log = get_logger('analyzer')
 
 DATA_PATH = Path(__file__).parent / "data" / "funds_sample.csv"
 
+# Profile fields accepted from the form (and batch files), with their defaults
+USER_INFO_DEFAULTS = {
+    'name': 'User',
+    'age': 30,
+    'annual_income': 500000,
+    'investment_amount': 50000,
+    'risk_tolerance': 'moderate',
+    'investment_goal': 'wealth_creation',
+    'investment_horizon': '5-10',
+    'monthly_sip': 0,
+    'existing_investments': 0,
+    'tax_bracket': 30,
+    'emergency_fund': 'yes',
+    'fund_type_preference': 'direct',
+    'esg_preference': 'no_preference',
+    'dividend_preference': 'growth',
+}
+
+
+def build_user_info(data):
+    """Pick the known profile fields from request data, filling in defaults"""
+    return {field: data.get(field, default) for field, default in USER_INFO_DEFAULTS.items()}
+
+# How often (seconds) request handlers may stat the data file for changes
+RELOAD_CHECK_INTERVAL = float(os.getenv('FUND_RELOAD_INTERVAL', 30))
+
 class MutualFundAnalyzer:
-    def __init__(self, data_path=DATA_PATH):
-        print("DEBUG: Initializing MutualFundAnalyzer...")
+    def __init__(self, data_path=DATA_PATH, reload_interval=RELOAD_CHECK_INTERVAL):
+        log.debug("Initializing MutualFundAnalyzer")
         if not data_path.is_file():
             raise FileNotFoundError(f"CRITICAL ERROR: Data file not found at {data_path}")
-        self.funds = pd.read_csv(data_path)
-        print("OK: funds_sample.csv loaded successfully.")
+        self.data_path = data_path
+        self.reload_interval = reload_interval
+        # Optional daily NAV history; a scoring window makes it drive the scores
+        self.nav_history = None
+        self.history_scoring = self._configured_scoring()
+        self._snapshot = FundSnapshot.load(data_path, self.history_scoring)
+        self._reload_lock = threading.Lock()
+        self._next_check = time.monotonic() + reload_interval
+        self.planner = AllocationPlanner()
+        self.analytics = PortfolioAnalytics()
+        self.fund_search = FundSearch()
+        self.top_funds_payloads = TopFundsPayloads()
+        log.info("Loaded %d funds from %s", len(self._snapshot.ranked_all), data_path.name)
+
+    @property
+    def snapshot(self):
+        """The current fund snapshot; read it once per request and keep using it"""
+        return self._snapshot
+
+    @property
+    def funds(self):
+        return self._snapshot.funds
+
+    def reload(self, force=False):
+        """Load the data file into a new snapshot and swap it in atomically.
+
+        Returns True if a new snapshot was published. Only one reload runs at a
+        time; concurrent callers return False instead of waiting.
+        """
+        if not self._reload_lock.acquire(blocking=False):
+            return False
+        try:
+            scoring = self._configured_scoring()
+            if not force and self._snapshot.is_current(self.data_path, scoring):
+                return False
+            snapshot = FundSnapshot.load(self.data_path, scoring)
+            # Single reference assignment: readers see either the old or new snapshot
+            self._snapshot = snapshot
+            self.history_scoring = scoring
+            FUND_RELOADS.inc(result='ok')
+            log.info("Fund data reloaded (%d funds)", len(snapshot.ranked_all))
+            return True
+        finally:
+            self._reload_lock.release()
+
+    def maybe_reload(self):
+        """Throttled change check for the request path; reloads in the background"""
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        self._next_check = now + self.reload_interval
+        try:
+            if self._snapshot.is_current(self.data_path, self._configured_scoring()):
+                return
+        except OSError as e:
+            log.warning("Cannot stat fund data file: %s", e)
+            return
+        threading.Thread(target=self._background_reload, name="fund-reload", daemon=True).start()
+
+    def _configured_scoring(self):
+        """HistoryScoring for the shared window; opens the NAV store once it exists"""
+        if self.nav_history is None:
+            self.nav_history = NavHistory.open()
+        return HistoryScoring.configured(self.nav_history)
+
+    def _background_reload(self):
+        try:
+            self.reload()
+        except Exception as e:
+            # Keep serving the previous snapshot if the new file is broken
+            FUND_RELOADS.inc(result='error')
+            log.exception("Fund data reload failed, keeping previous snapshot")
 
     def _safe_to_float(self, value, default=0.0):
         try: return float(value)
         except (ValueError, TypeError): return default
 
-    def score_fund(self, row):
+    def score_fund(self, row, metrics=None):
+        # NAV history metrics (nav_history.NavHistory.metrics) replace the CSV
+        # fields they cover, as in the vectorized scoring
+        if metrics:
+            row = dict(row)
+            for field, metric in HISTORY_SCORE_FIELDS.items():
+                value = metrics.get(metric)
+                if value is not None and value == value:
+                    row[field] = value
         sip_5yr_return = self._safe_to_float(row.get('sip_5yr_return'))
         sharpe_ratio = self._safe_to_float(row.get('sharpe_ratio'))
         expense_ratio = self._safe_to_float(row.get('expense_ratio'), 2.0)
@@ -29,66 +145,83 @@ class MutualFundAnalyzer:
         alpha_score = alpha * 0.2
         return returns_score + risk_adjusted_score + expense_score + alpha_score
 
-    def get_top_funds(self, category='large_cap', top_n=5):
-        df = self.funds.copy()
-        if category and category in df['category'].unique():
-            df = df[df['category'] == category]
-        if df.empty: return []
-        df['score'] = df.apply(self.score_fund, axis=1)
-        return df.sort_values('score', ascending=False).head(top_n).to_dict(orient='records')
+    def set_score_window(self, window, benchmark=None):
+        """Rank funds on NAV history metrics for window (e.g. '1y', '3y'); None for the CSV fields.
+
+        The window is stored with the NAV history, so other worker processes
+        pick it up on their next reload check.
+        """
+        if self.nav_history is None:
+            self.nav_history = NavHistory.open()
+        if self.nav_history is None:
+            if window is None:
+                return self.reload(force=True)
+            raise ValueError("No NAV history store (set NAV_HISTORY_DIR)")
+        if window is not None:
+            HistoryScoring(self.nav_history, window, benchmark)  # validate before publishing
+        self.nav_history.store.set_score_window(window, benchmark)
+        return self.reload(force=True)
+
+    def fund_metrics(self, fund_id, window='1y', benchmark=None):
+        """On-demand NAV history metrics for one fund, or None without history"""
+        if self.nav_history is None or not len(self.nav_history.store.series(fund_id)):
+            return None
+        return self.nav_history.metrics(fund_id, window, benchmark)
+
+    def get_top_funds(self, category='large_cap', top_n=5, snapshot=None):
+        if snapshot is None:
+            self.maybe_reload()
+            snapshot = self._snapshot
+        return snapshot.top_funds(category, top_n)
+
+    def top_funds_payload(self, category='large_cap'):
+        """Serialized /top-funds response for the current snapshot"""
+        self.maybe_reload()
+        return self.top_funds_payloads.get(self._snapshot, category)
+
+    def search_fields(self):
+        """Numeric columns /funds/search can filter and sort on"""
+        self.maybe_reload()
+        return self.fund_search.numeric_fields(self._snapshot)
+
+    def search_funds(self, query):
+        """Filtered, sorted page of funds; query comes from fund_search.parse_query"""
+        self.maybe_reload()
+        return self.fund_search.search(self._snapshot, query)
 
     def get_grow_url(self, fund_name):
-        safe_name = re.sub(r'\s+', '+', str(fund_name).strip())
-        return f"https://www.google.com/search?q={safe_name}+mutual+fund"
+        # Fund records already carry grow_url; kept for other callers
+        return grow_url(fund_name)
 
+    @timed_stage('get_recommendations')
     def get_recommendations(self, user_info):
         # --- NEW, SMARTER RECOMMENDATION LOGIC ---
-        print("DEBUG: Generating advanced recommendations based on full profile...")
         risk = user_info.get('risk_tolerance', 'moderate')
         horizon = user_info.get('investment_horizon', '5-10')
         goal = user_info.get('investment_goal', 'wealth_creation')
         invest_amount = self._safe_to_float(user_info.get('investment_amount', 0))
 
-        # 1. Base allocation on risk
-        if risk == 'low':
-            alloc = {'debt': 0.60, 'large_cap': 0.30, 'flexi_cap': 0.10}
-        elif risk == 'moderate':
-            alloc = {'debt': 0.20, 'large_cap': 0.40, 'flexi_cap': 0.25, 'mid_cap': 0.15}
-        else: # high
-            alloc = {'large_cap': 0.30, 'flexi_cap': 0.30, 'mid_cap': 0.20, 'small_cap': 0.20}
-
-        # 2. Adjust for investment horizon
-        if horizon in ['1-3', '3-5']:
-            # Short horizon: increase debt, reduce small/mid caps
-            alloc['debt'] = alloc.get('debt', 0) + 0.20
-            alloc['small_cap'] = 0
-            alloc['mid_cap'] = alloc.get('mid_cap', 0) * 0.5
-        elif horizon == '10+':
-            # Long horizon: can take more risk
-            alloc['debt'] = max(0, alloc.get('debt', 0) - 0.10)
-            
-        # 3. Adjust for specific goals
-        if goal == 'tax_saving':
-            # Ensure ELSS (tax_saving) funds are included
-            alloc['tax_saving'] = alloc.get('tax_saving', 0) + 0.15
-
-        # 4. Normalize percentages to add up to 100%
-        total_pct = sum(alloc.values())
-        alloc = {k: v / total_pct for k, v in alloc.items() if v > 0}
-
-        # 5. Create final allocation dictionary with amounts
-        final_allocations = {
-            k: {'percentage': round(v * 100), 'amount': round(invest_amount * v)}
-            for k, v in alloc.items()
-        }
+        # Allocation weights come from the precomputed table (see allocation_planner)
+        bucket = profile_bucket(risk, horizon, goal)
+        final_allocations = ALLOCATION_TABLE[bucket].allocations(invest_amount)
+
+        # Top funds for each allocated category, prebuilt per snapshot
+        self.maybe_reload()
+        snapshot = self._snapshot
+        bundle = self.planner.bundle(snapshot, bucket)
+        # Records are immutable and already carry grow_url, so no copies
+        recommendations = {cat: list(funds) for cat, funds in bundle.items()}
+
+        with timed('projections'):
+            projections = project_portfolio(user_info, final_allocations, recommendations)
+        with timed('portfolio_analytics'):
+            advanced_analysis = self.analytics.analyze(snapshot, user_info, final_allocations,
+                                                       recommendations, projections)
+        advanced_analysis['projections'] = projections
 
-        # 6. Get top funds for each allocated category
-        recommendations = {}
-        for cat in final_allocations.keys():
-            recommendations[cat] = self.get_top_funds(cat, top_n=2)
-            
         return {
             'recommendations': recommendations,
             'allocations': final_allocations,
-            'risk_profile': risk
+            'risk_profile': risk,
+            'advanced_analysis': advanced_analysis,
         }
@@ -0,0 +1,541 @@
+"""Daily NAV history: an append-only, memory-mapped store and rolling risk metrics.
+
+Each series (a fund id, or a benchmark index such as NIFTY50) is two raw
+files in the store directory that are only ever appended to:
+`<key>.day` (int32 days since 1970-01-01, strictly increasing) and
+`<key>.nav` (float64). Readers memory-map them. NAVs are written before
+days, and a series' length is the shorter of the two, so a reader racing an
+append never sees a day without its NAV. The VERSION file is rewritten
+after every ingest; the analyzer watches it to rebuild scores. The
+SCORE_WINDOW file holds the scoring window set through
+/admin/score-window, so every worker process ranks on the same window.
+
+Windows count trading days of returns (1y = 252). Metrics use the CSV's
+units (percent for returns, volatility, drawdown and alpha):
+
+- return: annualized growth over the window
+- volatility, sharpe_ratio, sortino_ratio: from daily returns, against
+  NAV_RISK_FREE_RATE
+- max_drawdown: worst fall from a peak inside the window
+- beta, alpha (Jensen's): against a benchmark series, on common dates
+- sip_return: annualized return of a monthly SIP over the window
+
+rolling() computes these at every date with cumulative sums. RollingWindow
+keeps the return sums for the latest window of a series and updates them
+in O(appended days) when new days arrive.
+
+    python nav_history.py ingest navs.csv            # fund_id,date,nav rows
+    python nav_history.py metrics F001 --window 3y --benchmark NIFTY50
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from fund_scoring import HISTORY_SCORE_FIELDS
+from instrumentation import get_logger
+
+log = get_logger('nav_history')
+
+NAV_HISTORY_DIR = Path(os.getenv('NAV_HISTORY_DIR', Path(__file__).parent / "data" / "nav_history"))
+RISK_FREE_RATE = float(os.getenv('NAV_RISK_FREE_RATE', 0.065))
+TRADING_DAYS = 252
+WINDOWS = {'1m': 21, '3m': 63, '6m': 126, '1y': 252, '3y': 756, '5y': 1260}
+METRICS = ('return', 'volatility', 'max_drawdown', 'sharpe_ratio', 'sortino_ratio', 'beta', 'alpha', 'sip_return')
+
+DAY_DTYPE = np.dtype('<i4')
+NAV_DTYPE = np.dtype('<f8')
+_UNSAFE = re.compile(r'[^A-Za-z0-9_-]')
+
+
+def window_days(window) -> int:
+    """Trading days in a window: '1m' ... '5y', or a number of days ('300' or '300d')"""
+    if isinstance(window, (int, np.integer)):
+        days = int(window)
+    else:
+        text = str(window).strip().lower()
+        days = WINDOWS.get(text)
+        if days is None:
+            try:
+                days = int(text[:-1] if text.endswith('d') else text)
+            except ValueError:
+                raise ValueError(f"Unknown window {window!r}; expected one of {', '.join(WINDOWS)} "
+                                 f"or a number of trading days")
+    if days < 2:
+        raise ValueError("A window needs at least 2 trading days")
+    return days
+
+
+def _daily_rate(annual_rate: float) -> float:
+    return (1 + annual_rate) ** (1 / TRADING_DAYS) - 1
+
+
+def to_days(dates) -> np.ndarray:
+    """ISO dates (or datetime64 values) -> int days since 1970-01-01"""
+    return np.asarray(dates, dtype='datetime64[D]').astype(np.int64)
+
+
+class Series(NamedTuple):
+    days: np.ndarray  # int32 days since 1970-01-01, strictly increasing
+    navs: np.ndarray  # float64
+
+    def __len__(self):
+        return len(self.navs)
+
+
+EMPTY = Series(np.empty(0, dtype=DAY_DTYPE), np.empty(0, dtype=NAV_DTYPE))
+
+
+class NavStore:
+    """Append-only per-series arrays on disk, read through memory maps"""
+
+    def __init__(self, root=NAV_HISTORY_DIR):
+        self.root = Path(root)
+        self._maps: Dict[str, Tuple[int, Series]] = {}
+        self._write_lock = threading.Lock()
+
+    @staticmethod
+    def key(series_id) -> str:
+        return _UNSAFE.sub(lambda m: f"~{ord(m.group()):04x}", str(series_id))
+
+    @staticmethod
+    def series_id(key: str) -> str:
+        return re.sub(r'~([0-9a-f]{4})', lambda m: chr(int(m.group(1), 16)), key)
+
+    def _paths(self, series_id) -> Tuple[Path, Path]:
+        key = self.key(series_id)
+        return self.root / f"{key}.day", self.root / f"{key}.nav"
+
+    def ids(self):
+        return sorted(self.series_id(path.stem) for path in self.root.glob("*.nav"))
+
+    def series(self, series_id) -> Series:
+        day_path, nav_path = self._paths(series_id)
+        try:
+            length = min(day_path.stat().st_size // DAY_DTYPE.itemsize,
+                         nav_path.stat().st_size // NAV_DTYPE.itemsize)
+        except FileNotFoundError:
+            return EMPTY
+        if length == 0:
+            return EMPTY
+        cached = self._maps.get(series_id)
+        if cached is not None and cached[0] == length:
+            return cached[1]
+        # Map exactly `length` items; a concurrent append only grows the files
+        series = Series(np.memmap(day_path, dtype=DAY_DTYPE, mode='r', shape=(length,)),
+                        np.memmap(nav_path, dtype=NAV_DTYPE, mode='r', shape=(length,)))
+        self._maps[series_id] = (length, series)
+        return series
+
+    def append(self, series_id, days, navs) -> int:
+        """Append days after the last stored one; returns how many were added.
+
+        Days on or before the last stored day, non-positive NAVs and all but
+        the last row for a repeated day are skipped, so re-ingesting an
+        overlapping file is harmless.
+        """
+        days = np.asarray(days, dtype=np.int64)
+        navs = np.asarray(navs, dtype=np.float64)
+        order = np.argsort(days, kind='stable')
+        days, navs = days[order], navs[order]
+        keep = np.isfinite(navs) & (navs > 0)
+        keep[:-1] &= days[1:] != days[:-1]
+        with self._write_lock:
+            current = self.series(series_id)
+            length = len(current)
+            if length:
+                keep &= days > current.days[-1]
+            days, navs = days[keep], navs[keep]
+            if not len(days):
+                return 0
+            self.root.mkdir(parents=True, exist_ok=True)
+            day_path, nav_path = self._paths(series_id)
+            # An interrupted append can leave one file longer; cut both back first
+            for path, dtype in ((day_path, DAY_DTYPE), (nav_path, NAV_DTYPE)):
+                if path.exists() and path.stat().st_size != length * dtype.itemsize:
+                    os.truncate(path, length * dtype.itemsize)
+            with open(nav_path, 'ab') as f:
+                f.write(navs.astype(NAV_DTYPE).tobytes())
+            with open(day_path, 'ab') as f:
+                f.write(days.astype(DAY_DTYPE).tobytes())
+        return len(days)
+
+    def bump_version(self):
+        """Mark the store as changed (watched through signature())"""
+        self.root.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(str(time.time_ns()))
+        os.replace(tmp_path, self.root / "VERSION")
+
+    def score_window(self) -> Optional[Dict[str, Any]]:
+        """Shared scoring window {'window', 'benchmark'}, or None if never set"""
+        try:
+            with open(self.root / "SCORE_WINDOW", encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            log.warning("Ignoring unreadable SCORE_WINDOW: %s", e)
+            return None
+
+    def set_score_window(self, window: Optional[str], benchmark: Optional[str] = None):
+        """Publish the scoring window for every process; window None means the CSV fields"""
+        self.root.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'window': window, 'benchmark': benchmark}, f)
+        os.replace(tmp_path, self.root / "SCORE_WINDOW")
+
+    def signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.root / "VERSION")
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+
+def _stats_from_sums(count: int, total: float, squares: float, downside: float,
+                     growth: float, rf_daily: float) -> Dict[str, float]:
+    """return, volatility, sharpe_ratio and sortino_ratio from window sums"""
+    mean = total / count
+    variance = max((squares - total * total / count) / (count - 1), 0.0)
+    std = np.sqrt(variance)
+    downside_dev = np.sqrt(downside / count)
+    annualize = np.sqrt(TRADING_DAYS)
+    return {
+        'return': (growth ** (TRADING_DAYS / count) - 1) * 100 if growth > 0 else np.nan,
+        'volatility': std * annualize * 100,
+        'sharpe_ratio': (mean - rf_daily) / std * annualize if std > 0 else np.nan,
+        'sortino_ratio': (mean - rf_daily) / downside_dev * annualize if downside_dev > 0 else np.nan,
+    }
+
+
+def max_drawdown(navs: np.ndarray) -> float:
+    return float((navs / np.maximum.accumulate(navs) - 1).min() * 100)
+
+
+def sip_return(days: np.ndarray, navs: np.ndarray) -> float:
+    """Annualized return (percent) of equal instalments on the first trading day of each month"""
+    months = days.astype('datetime64[D]').astype('datetime64[M]')
+    starts = np.flatnonzero(np.r_[True, months[1:] != months[:-1]])
+    starts = starts[starts < len(navs) - 1]
+    if len(starts) < 2:
+        return np.nan
+    # Each instalment of 1 is worth nav_end / nav_k at the end; solve
+    # sum (1 + x) ** years_k = final value for x with Newton's method
+    final_value = (navs[-1] / navs[starts]).sum()
+    years = (days[-1] - days[starts]) / 365.0
+    rate = 0.1
+    for _ in range(50):
+        growth = (1 + rate) ** years
+        step = (growth.sum() - final_value) / (years * growth / (1 + rate)).sum()
+        rate = max(rate - step, -0.99)
+        if abs(step) < 1e-10:
+            break
+    return rate * 100
+
+
+def _aligned_returns(series: Series, benchmark: Series, first_day=None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(days, fund returns, benchmark returns) on the days both series have, from first_day on"""
+    fund_days, fund_navs = series
+    bench_days, bench_navs = benchmark
+    if first_day is not None:
+        fund_start = np.searchsorted(fund_days, first_day)
+        bench_start = np.searchsorted(bench_days, first_day)
+        fund_days, fund_navs = fund_days[fund_start:], fund_navs[fund_start:]
+        bench_days, bench_navs = bench_days[bench_start:], bench_navs[bench_start:]
+    if np.array_equal(fund_days, bench_days):
+        # Usual case: both series trade on the same calendar
+        days, fund, bench = fund_days, fund_navs, bench_navs
+    else:
+        days, fund_at, bench_at = np.intersect1d(fund_days, bench_days, assume_unique=True, return_indices=True)
+        fund, bench = fund_navs[fund_at], bench_navs[bench_at]
+    fund = np.asarray(fund, dtype=np.float64)
+    bench = np.asarray(bench, dtype=np.float64)
+    return np.asarray(days[1:], dtype=np.int64), fund[1:] / fund[:-1] - 1, bench[1:] / bench[:-1] - 1
+
+
+def beta_alpha(fund_returns: np.ndarray, bench_returns: np.ndarray, rf_daily: float) -> Tuple[float, float]:
+    """Beta and annualized Jensen's alpha (percent) from aligned daily returns"""
+    if len(fund_returns) < 2:
+        return np.nan, np.nan
+    fund_mean, bench_mean = fund_returns.mean(), bench_returns.mean()
+    bench_centered = bench_returns - bench_mean
+    bench_var = bench_centered @ bench_centered
+    if bench_var <= 0:
+        return np.nan, np.nan
+    beta = ((fund_returns - fund_mean) @ bench_centered) / bench_var
+    alpha = ((fund_mean - rf_daily) - beta * (bench_mean - rf_daily)) * TRADING_DAYS * 100
+    return float(beta), float(alpha)
+
+
+class RollingWindow:
+    """Daily-return sums over the latest window of one series.
+
+    update() adds the returns of newly appended days and subtracts the ones
+    that slid out of the window, so a new day costs O(1) rather than a pass
+    over the window. The sums are rebuilt from scratch once per window
+    length of updates to keep float error from accumulating.
+    """
+
+    def __init__(self, window, risk_free: float = RISK_FREE_RATE):
+        self.size = window_days(window)
+        self.rf_daily = _daily_rate(risk_free)
+        self.length = 0  # NAVs covered so far
+        self.sums = np.zeros(3)  # sum r, sum r^2, sum min(r - rf, 0)^2
+        self.updates = 0
+
+    def _sums(self, navs: np.ndarray, first: int, stop: int) -> np.ndarray:
+        """Sums over returns first..stop-1, where return i is navs[i] / navs[i - 1] - 1"""
+        if stop <= first:
+            return np.zeros(3)
+        window = np.asarray(navs[first - 1:stop], dtype=np.float64)
+        returns = window[1:] / window[:-1] - 1
+        shortfall = np.minimum(returns - self.rf_daily, 0.0)
+        return np.array([returns.sum(), (returns * returns).sum(), (shortfall * shortfall).sum()])
+
+    def update(self, navs: np.ndarray) -> None:
+        length = len(navs)
+        if length == self.length:
+            return
+        first = max(length - self.size, 1)
+        if length < self.length or length - self.length >= self.size or self.updates >= self.size:
+            self.sums = self._sums(navs, first, length)
+            self.updates = 0
+        else:
+            old_first = max(self.length - self.size, 1)
+            self.sums = (self.sums + self._sums(navs, max(self.length, 1), length)
+                         - self._sums(navs, old_first, first))
+            self.updates += 1
+        self.length = length
+
+    def stats(self, navs: np.ndarray) -> Dict[str, float]:
+        """Window return statistics; NaN until the series spans a full window"""
+        self.update(navs)
+        if self.length <= self.size:
+            return dict.fromkeys(('return', 'volatility', 'sharpe_ratio', 'sortino_ratio'), np.nan)
+        total, squares, downside = self.sums
+        growth = float(navs[self.length - 1]) / float(navs[self.length - 1 - self.size])
+        return _stats_from_sums(self.size, total, squares, downside, growth, self.rf_daily)
+
+
+class NavHistory:
+    """NAV store plus on-demand window metrics with incremental state per series"""
+
+    def __init__(self, root=NAV_HISTORY_DIR, risk_free: float = RISK_FREE_RATE):
+        self.store = NavStore(root)
+        self.risk_free = risk_free
+        self.rf_daily = _daily_rate(risk_free)
+        self._windows: Dict[Tuple[str, int], RollingWindow] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def open(cls, root=None) -> Optional['NavHistory']:
+        """The history at root (NAV_HISTORY_DIR by default), or None if there is none"""
+        root = Path(root) if root is not None else NAV_HISTORY_DIR
+        return cls(root) if root.is_dir() else None
+
+    def signature(self):
+        return self.store.signature()
+
+    def append(self, series_id, dates, navs) -> int:
+        added = self.store.append(series_id, to_days(dates), navs)
+        if added:
+            self.store.bump_version()
+        return added
+
+    def append_day(self, date, navs: Dict[str, float]) -> int:
+        """Append one day's NAVs for many series (the daily update), bumping the version once"""
+        day = to_days([date])
+        added = sum(self.store.append(series_id, day, [nav]) for series_id, nav in navs.items())
+        if added:
+            self.store.bump_version()
+        return added
+
+    def ingest_csv(self, path) -> Dict[str, int]:
+        """Bulk-load a CSV of fund_id (or id), date, nav rows in any order"""
+        import pandas as pd
+
+        frame = pd.read_csv(path)
+        frame.columns = [str(c).strip().lower() for c in frame.columns]
+        id_column = next((c for c in ('fund_id', 'id', 'series_id') if c in frame.columns), None)
+        if id_column is None or 'date' not in frame.columns or 'nav' not in frame.columns:
+            raise ValueError("NAV CSV needs fund_id (or id), date and nav columns")
+        dates = pd.to_datetime(frame['date'], errors='coerce')
+        navs = pd.to_numeric(frame['nav'], errors='coerce')
+        valid = dates.notna() & navs.notna()
+        frame = pd.DataFrame({'id': frame[id_column].astype(str).str.strip(),
+                              'day': dates.to_numpy(dtype='datetime64[D]').astype(np.int64),
+                              'nav': navs.to_numpy(dtype=np.float64)})[valid.to_numpy()]
+        added = 0
+        for series_id, rows in frame.groupby('id', sort=False):
+            added += self.store.append(series_id, rows['day'].to_numpy(), rows['nav'].to_numpy())
+        if added:
+            self.store.bump_version()
+        stats = {'rows': int(len(valid)), 'skipped': int(len(valid) - added),
+                 'series': int(frame['id'].nunique()), 'added': added}
+        log.info("Ingested %s: %s", Path(path).name, stats)
+        return stats
+
+    def metrics(self, series_id, window='1y', benchmark=None) -> Dict[str, float]:
+        """Point-in-time metrics over the latest window; NaN where history is too short"""
+        size = window_days(window)
+        series = self.store.series(series_id)
+        result = dict.fromkeys(METRICS, np.nan)
+        if len(series) <= size:
+            return result
+        with self._lock:
+            state = self._windows.get((series_id, size))
+            if state is None:
+                state = self._windows[series_id, size] = RollingWindow(size, self.risk_free)
+            result.update(state.stats(series.navs))
+        days = np.asarray(series.days[-size - 1:], dtype=np.int64)
+        navs = np.asarray(series.navs[-size - 1:], dtype=np.float64)
+        result['max_drawdown'] = max_drawdown(navs)
+        result['sip_return'] = sip_return(days, navs)
+        if benchmark is not None:
+            _, fund_returns, bench_returns = _aligned_returns(series, self.store.series(benchmark), days[0])
+            result['beta'], result['alpha'] = beta_alpha(fund_returns, bench_returns, self.rf_daily)
+        return {name: float(value) for name, value in result.items()}
+
+    def metric_columns(self, ids: Sequence, window='1y', benchmark=None) -> Dict[str, np.ndarray]:
+        """metric -> float64 array aligned with ids (NaN for funds without enough history)"""
+        columns = {name: np.full(len(ids), np.nan) for name in METRICS}
+        for row, series_id in enumerate(ids):
+            for name, value in self.metrics(str(series_id), window, benchmark).items():
+                columns[name][row] = value
+        return columns
+
+    def rolling(self, series_id, window='1y', benchmark=None) -> Dict[str, np.ndarray]:
+        """Each metric for the window ending at every date with a full window behind it.
+
+        With a benchmark, everything is computed on the dates both series have.
+        max_drawdown here is the drawdown from the window's peak at each date.
+        """
+        size = window_days(window)
+        series = self.store.series(series_id)
+        if benchmark is not None:
+            days, returns, bench_returns = _aligned_returns(series, self.store.series(benchmark))
+            navs = np.r_[1.0, np.cumprod(1 + returns)]
+        else:
+            navs = np.asarray(series.navs, dtype=np.float64)
+            days = np.asarray(series.days[1:], dtype=np.int64)
+            returns = navs[1:] / navs[:-1] - 1
+            bench_returns = None
+        if len(returns) < size:
+            return {'dates': np.empty(0, dtype='datetime64[D]'), **{name: np.empty(0) for name in METRICS}}
+
+        def window_sums(values):
+            cumulative = np.r_[0.0, np.cumsum(values)]
+            return cumulative[size:] - cumulative[:-size]
+
+        total = window_sums(returns)
+        squares = window_sums(returns * returns)
+        shortfall = np.minimum(returns - self.rf_daily, 0.0)
+        downside = window_sums(shortfall * shortfall)
+        mean = total / size
+        std = np.sqrt(np.maximum((squares - total * total / size) / (size - 1), 0.0))
+        downside_dev = np.sqrt(downside / size)
+        annualize = np.sqrt(TRADING_DAYS)
+        growth = navs[size:] / navs[:-size]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            result = {
+                'dates': days[size - 1:].astype('datetime64[D]'),
+                'return': (growth ** (TRADING_DAYS / size) - 1) * 100,
+                'volatility': std * annualize * 100,
+                'sharpe_ratio': np.where(std > 0, (mean - self.rf_daily) / std * annualize, np.nan),
+                'sortino_ratio': np.where(downside_dev > 0, (mean - self.rf_daily) / downside_dev * annualize,
+                                          np.nan),
+                'max_drawdown': (navs[size:] / np.lib.stride_tricks.sliding_window_view(navs, size + 1).max(axis=1)
+                                 - 1) * 100,
+                'beta': np.full(len(total), np.nan),
+                'alpha': np.full(len(total), np.nan),
+                'sip_return': np.full(len(total), np.nan),
+            }
+            if bench_returns is not None:
+                bench_total = window_sums(bench_returns)
+                bench_var = (window_sums(bench_returns * bench_returns) - bench_total ** 2 / size) / (size - 1)
+                covariance = (window_sums(returns * bench_returns) - total * bench_total / size) / (size - 1)
+                beta = np.where(bench_var > 0, covariance / bench_var, np.nan)
+                result['beta'] = beta
+                result['alpha'] = ((mean - self.rf_daily) - beta * (bench_total / size - self.rf_daily)) * (
+                    TRADING_DAYS * 100)
+        return result
+
+
+class HistoryScoring:
+    """Score inputs computed from NAV history for one window and benchmark.
+
+    The metrics replace the CSV fields listed in fund_scoring.HISTORY_SCORE_FIELDS
+    for every fund with a full window of history; other funds keep their CSV values.
+    """
+
+    def __init__(self, history: NavHistory, window='3y', benchmark: Optional[str] = None):
+        window_days(window)  # validate early
+        self.history = history
+        self.window = window
+        self.benchmark = benchmark
+
+    @classmethod
+    def configured(cls, history: Optional[NavHistory]) -> Optional['HistoryScoring']:
+        """The store's SCORE_WINDOW if set, else NAV_SCORE_WINDOW (and optional NAV_BENCHMARK)"""
+        if history is None:
+            return None
+        config = history.store.score_window()
+        if config is None:
+            window, benchmark = os.getenv('NAV_SCORE_WINDOW'), os.getenv('NAV_BENCHMARK') or None
+        else:
+            window, benchmark = config.get('window'), config.get('benchmark')
+        if not window:
+            return None
+        try:
+            return cls(history, window, benchmark)
+        except ValueError as e:
+            log.warning("Ignoring scoring window %r: %s", window, e)
+            return None
+
+    def signature(self):
+        return self.history.signature(), str(self.window), self.benchmark
+
+    def score_overrides(self, ids: Sequence) -> Dict[str, np.ndarray]:
+        metrics = self.history.metric_columns(ids, self.window, self.benchmark)
+        return {column: metrics[metric] for column, metric in HISTORY_SCORE_FIELDS.items()}
+
+
+def _json_metrics(metrics: Dict[str, Any]) -> Dict[str, Any]:
+    return {name: None if value != value else round(value, 4) for name, value in metrics.items()}
+
+
+def main(argv: Optional[Iterable[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--dir', default=str(NAV_HISTORY_DIR), help="store directory (NAV_HISTORY_DIR)")
+    commands = parser.add_subparsers(dest='command', required=True)
+    ingest = commands.add_parser('ingest', help="append NAV rows from CSV files")
+    ingest.add_argument('files', nargs='+')
+    show = commands.add_parser('metrics', help="print window metrics for series")
+    show.add_argument('series', nargs='+')
+    show.add_argument('--window', default='1y')
+    show.add_argument('--benchmark')
+    args = parser.parse_args(argv)
+
+    history = NavHistory(args.dir)
+    if args.command == 'ingest':
+        for path in args.files:
+            print(f"{path}: {json.dumps(history.ingest_csv(path))}")
+    else:
+        for series_id in args.series:
+            metrics = history.metrics(series_id, args.window, args.benchmark)
+            print(f"{series_id}: {json.dumps(_json_metrics(metrics))}")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,84 @@
+"""Pre-serialized, pre-compressed /top-funds responses.
+
+The /top-funds body depends only on the category and the fund snapshot, so
+TopFundsPayloads serializes every category's payload once per snapshot and
+keeps the identity, gzip and, when the optional brotli package is
+installed, br encodings of the bytes. Each body gets a strong ETag from its
+content hash, so an unchanged category keeps its ETag across reloads and
+clients can revalidate with If-None-Match; a 304 is only sent for the tag
+of the encoding chosen for that request.
+"""
+import gzip
+import hashlib
+import json
+import threading
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+from fund_record import json_default
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+TOP_N = 5
+ALL_FUNDS = None  # payload key for unknown or empty categories, like FundSnapshot.ranked
+
+
+def dumps(payload: Any) -> bytes:
+    # Same bytes jsonify produces outside debug mode
+    return (json.dumps(payload, sort_keys=True, separators=(',', ':'), default=json_default) + "\n").encode()
+
+
+class Payload(NamedTuple):
+    etag: str                   # strong ETag (unquoted) of the identity body
+    bodies: Dict[str, bytes]    # content-coding ('identity', 'gzip', 'br') -> bytes
+
+    def tag(self, encoding: str) -> str:
+        """ETag of one representation; strong ETags differ per content-coding"""
+        return self.etag if encoding == 'identity' else f'{self.etag}-{encoding}'
+
+    def negotiate(self, accept_encoding) -> str:
+        """Best stored encoding the client accepts (werkzeug Accept header)"""
+        for encoding in ('br', 'gzip'):
+            if encoding in self.bodies and accept_encoding[encoding]:
+                return encoding
+        return 'identity'
+
+
+def build_payload(data: Any) -> Payload:
+    body = dumps(data)
+    bodies = {'identity': body, 'gzip': gzip.compress(body, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        bodies['br'] = brotli.compress(body)
+    return Payload(hashlib.sha256(body).hexdigest()[:32], bodies)
+
+
+class TopFundsPayloads:
+    """Per-snapshot /top-funds payloads; rebuilt lazily when the snapshot changes"""
+
+    def __init__(self, top_n: int = TOP_N):
+        self.top_n = top_n
+        self._state: Tuple[Any, Optional[Dict[Any, Payload]]] = (None, None)
+        self._lock = threading.Lock()
+
+    def _build(self, snapshot) -> Dict[Any, Payload]:
+        payloads = {}
+        for category in [ALL_FUNDS] + list(snapshot.ranked_by_category):
+            funds = snapshot.top_funds(category, self.top_n)
+            payloads[category] = build_payload({'success': True, 'funds': funds})
+        return payloads
+
+    def payloads(self, snapshot) -> Dict[Any, Payload]:
+        built_for, payloads = self._state
+        if built_for is not snapshot:
+            with self._lock:
+                built_for, payloads = self._state
+                if built_for is not snapshot:
+                    payloads = self._build(snapshot)
+                    self._state = (snapshot, payloads)
+        return payloads
+
+    def get(self, snapshot, category: Optional[str]) -> Payload:
+        payloads = self.payloads(snapshot)
+        return payloads.get(category or ALL_FUNDS, payloads[ALL_FUNDS])
@@ -0,0 +1,265 @@
+"""Portfolio analytics for advanced_analysis: diversification, expense impact,
+volatility mix, risk warnings and peer comparison.
+
+Everything that depends only on the fund universe (per-category medians,
+cheapest expense ratio, best peer by risk-adjusted return, row lookup by
+fund id) lives in a PeerIndex built once per snapshot from its columns.
+A request then gathers the recommended funds' rows out of those columns
+with one fancy index and works on a weight vector, so no sorting or
+DataFrame work happens per request.
+"""
+import threading
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from fund_scoring import category_positions, coerce_numeric_columns
+from projections import (HORIZON_YEARS, MARKET_VOLATILITY, RANK_VOLATILITY_MULTIPLIER,
+                         VOLATILITY_BY_RANK, CATEGORY_VOLATILITY_CAP, deterministic_value)
+
+VOLATILITY_RANKS = ('low', 'moderate', 'high')
+# Highest share (%) of high-volatility funds that still suits each risk tolerance
+HIGH_VOLATILITY_LIMIT = {'low': 10, 'moderate': 40, 'high': 100}
+EXPENSIVE_RATIO = 1.0  # % p.a.; above this the expense drag is called out
+MAX_CATEGORIES_SCORED = 5
+
+ANALYTICS_DEFAULTS = {'expense_ratio': 2.0, 'returns_5y': 0.0, 'returns_3y': 0.0, 'beta': 0.0,
+                      'esg_score': 0.0, 'peer_rank': 0.0}
+
+
+def _amount(value) -> float:
+    try:
+        value = float(value)
+    except (ValueError, TypeError):
+        return 0.0
+    return value if np.isfinite(value) else 0.0
+
+
+def _volatility_column(columns: Dict[str, np.ndarray], beta: np.ndarray) -> np.ndarray:
+    # Same estimate as projections.fund_volatility, over whole columns
+    ranks = columns['volatility_rank'].tolist() if 'volatility_rank' in columns else [None] * len(beta)
+    multiplier = np.array([RANK_VOLATILITY_MULTIPLIER.get(r, 1.0) for r in ranks])
+    fallback = np.array([VOLATILITY_BY_RANK.get(r, VOLATILITY_BY_RANK['moderate']) for r in ranks])
+    cap = np.array([CATEGORY_VOLATILITY_CAP.get(c, 1.0) for c in columns['category'].tolist()])
+    return np.minimum(np.where(beta > 0, beta * MARKET_VOLATILITY * multiplier, fallback), cap)
+
+
+class PeerIndex:
+    """Columnar per-snapshot lookups for portfolio analytics"""
+
+    def __init__(self, columns: Dict[str, np.ndarray]):
+        numeric = {name: np.nan_to_num(values, nan=ANALYTICS_DEFAULTS[name])
+                   for name, values in coerce_numeric_columns(columns, ANALYTICS_DEFAULTS).items()}
+        self.names = columns['name'].tolist() if 'name' in columns else [''] * len(numeric['beta'])
+        self.categories = columns['category'].tolist()
+        self.volatility_ranks = (columns['volatility_rank'].tolist() if 'volatility_rank' in columns
+                                 else [None] * len(self.names))
+        self.expense_ratio = numeric['expense_ratio']
+        annual_return = np.where(numeric['returns_5y'] != 0, numeric['returns_5y'], numeric['returns_3y'])
+        self.annual_return = annual_return
+        # Return scaled down for volatility above the market's, in %
+        volatility = _volatility_column(columns, numeric['beta'])
+        self.risk_adjusted_return = annual_return * np.minimum(1.0, MARKET_VOLATILITY / volatility)
+        self.esg_score = numeric['esg_score']
+        self.peer_rank = numeric['peer_rank']
+        self.row_by_id = {fund_id: i for i, fund_id in enumerate(columns['id'].tolist())} if 'id' in columns else {}
+
+        self.category_stats = {}
+        for category, rows in category_positions(columns['category']).items():
+            best = int(rows[np.argmax(self.risk_adjusted_return[rows])])
+            self.category_stats[category] = {
+                'peers': len(rows),
+                'median_expense_ratio': float(np.median(self.expense_ratio[rows])),
+                'min_expense_ratio': float(self.expense_ratio[rows].min()),
+                'median_risk_adjusted_return': float(np.median(self.risk_adjusted_return[rows])),
+                'best_row': best,
+            }
+
+
+def _fund_weights(allocations, recommendations, row_by_id):
+    """Row indices of the recommended funds and their portfolio weights"""
+    rows, weights, categories = [], [], []
+    for category, alloc in allocations.items():
+        funds = [f for f in recommendations.get(category) or [] if f.get('id') in row_by_id]
+        for fund in funds:
+            rows.append(row_by_id[fund['id']])
+            weights.append(alloc.get('percentage', 0) / len(funds))
+            categories.append(category)
+    weights = np.array(weights, dtype=np.float64)
+    total = weights.sum()
+    return np.array(rows, dtype=np.intp), (weights / total if total > 0 else weights), categories
+
+
+def diversification_score(category_weights: Sequence[float], total_funds: int) -> Dict[str, Any]:
+    """Breadth (20 points per category, up to five) plus balance (up to 50 points)"""
+    weights = np.asarray(category_weights, dtype=np.float64)
+    categories = len(weights)
+    breadth = 20 * min(categories, MAX_CATEGORIES_SCORED)
+    # Effective number of categories (inverse Herfindahl) relative to the actual count
+    balance = 50 / (weights @ weights) / categories if categories else 0
+    score = round(breadth + balance)
+    if score >= 120:
+        assessment = "Well diversified across categories with balanced weights."
+    elif score >= 90:
+        assessment = "Reasonably diversified; a few categories carry most of the weight."
+    else:
+        assessment = "Concentrated portfolio; consider spreading across more categories."
+    return {'score': score, 'categories': categories, 'total_funds': total_funds, 'assessment': assessment}
+
+
+def expense_impact(lumpsum: float, monthly_sip: float, months: int, annual_return: float,
+                   expense_ratio: float, cheapest_expense_ratio: float) -> Dict[str, Any]:
+    """Corpus lost to fees over the horizon, from closed-form future values.
+
+    Fund returns are net of fees, so the gross return is return + expense
+    ratio; the drag is the gap between the gross and net corpus.
+    """
+    net = deterministic_value(lumpsum, monthly_sip, annual_return, months)
+    gross = deterministic_value(lumpsum, monthly_sip, annual_return + expense_ratio, months)
+    cheapest = deterministic_value(lumpsum, monthly_sip, annual_return + expense_ratio - cheapest_expense_ratio, months)
+    expense_pct = expense_ratio * 100
+    if expense_pct <= 0.5:
+        assessment = "Low cost: fees have a small effect on long-term returns."
+    elif expense_pct <= EXPENSIVE_RATIO:
+        assessment = "Moderate cost: fees are in line with direct-plan averages."
+    else:
+        assessment = "High cost: fees take a noticeable share of returns; look at cheaper alternatives."
+    return {
+        'average_expense_ratio': round(expense_pct, 2),
+        'total_expense_over_period': round(gross - net),
+        'potential_savings': round(max(cheapest - net, 0.0)),
+        'impact_assessment': assessment,
+    }
+
+
+def volatility_analysis(ranks: Sequence[str], weights: np.ndarray, risk: str) -> Dict[str, Any]:
+    breakdown = {rank: 0 for rank in VOLATILITY_RANKS}
+    mix = dict.fromkeys(VOLATILITY_RANKS, 0.0)
+    for rank, weight in zip(ranks, weights.tolist()):
+        rank = rank if rank in breakdown else 'moderate'
+        breakdown[rank] += 1
+        mix[rank] += weight * 100
+    high = mix['high']
+    limit = HIGH_VOLATILITY_LIMIT.get(risk, HIGH_VOLATILITY_LIMIT['moderate'])
+    if high > limit:
+        assessment = f"{high:.0f}% of the portfolio is in high-volatility funds, above what suits a {risk} risk profile."
+    elif high > 0:
+        assessment = f"High-volatility exposure of {high:.0f}% is within range for a {risk} risk profile."
+    else:
+        assessment = "No high-volatility funds; expect relatively stable returns."
+    return {
+        'volatility_breakdown': breakdown,
+        'volatility_mix': {rank: round(pct, 1) for rank, pct in mix.items()},
+        'high_volatility_percentage': round(high, 1),
+        'risk_assessment': assessment,
+    }
+
+
+def risk_warnings(user_info: Mapping[str, Any], allocations: Mapping[str, Mapping[str, Any]],
+                  weights: np.ndarray, volatility: Dict[str, Any], expenses: Optional[Dict[str, Any]],
+                  projections: Mapping[str, Any]) -> List[str]:
+    warnings = []
+    risk = user_info.get('risk_tolerance', 'moderate')
+    horizon = user_info.get('investment_horizon', '5-10')
+    if volatility['high_volatility_percentage'] > HIGH_VOLATILITY_LIMIT.get(risk, 40):
+        warnings.append(volatility['risk_assessment'])
+    equity = sum(a.get('percentage', 0) for c, a in allocations.items() if c != 'debt')
+    if horizon == '1-3' and equity > 50:
+        warnings.append(f"{equity}% equity over a 1-3 year horizon: a market fall may not recover in time.")
+    if len(weights) and weights.max() > 0.3:
+        warnings.append(f"A single fund makes up {weights.max() * 100:.0f}% of the portfolio.")
+    if expenses and expenses['average_expense_ratio'] > EXPENSIVE_RATIO:
+        warnings.append(f"Average expense ratio of {expenses['average_expense_ratio']}% is high for direct plans.")
+    loss = (projections or {}).get('monte_carlo', {}).get('probability_of_loss', 0)
+    if loss >= 10:
+        warnings.append(f"About {loss:.0f}% of simulated scenarios end below the amount invested.")
+    if allocations.get('small_cap', {}).get('percentage', 0) >= 20:
+        warnings.append("Small-cap funds can fall 40-50% in a downturn; size the allocation accordingly.")
+    return warnings
+
+
+def peer_comparison(index: PeerIndex, rows: np.ndarray, categories: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+    """Top recommended fund per category against its category's peers"""
+    comparison = {}
+    for row, category in zip(rows.tolist(), categories):
+        if category in comparison:
+            continue  # funds come best-first within a category
+        stats = index.category_stats.get(index.categories[row])
+        if stats is None:
+            continue
+        rar = float(index.risk_adjusted_return[row])
+        er = float(index.expense_ratio[row])
+        label = category.replace('_', ' ')
+        reasons = []
+        if rar > stats['median_risk_adjusted_return']:
+            reasons.append(f"{rar - stats['median_risk_adjusted_return']:.1f} pts above the category median "
+                           f"risk-adjusted return")
+        if er < stats['median_expense_ratio']:
+            reasons.append(f"expense ratio {er:.2f}% vs {stats['median_expense_ratio']:.2f}% median")
+        best = stats['best_row']
+        if best != row:
+            reasons.append(f"{index.names[best]} has the best risk-adjusted return "
+                           f"({index.risk_adjusted_return[best]:.1f}%) but a lower overall score")
+        comparison[category] = {
+            'fund_name': index.names[row],
+            'peer_rank': int(index.peer_rank[row]),
+            'risk_adjusted_return': round(rar, 2),
+            'esg_score': round(float(index.esg_score[row]), 1),
+            'peers': stats['peers'],
+            'why_better': (f"Only {label} fund in the current universe." if stats['peers'] == 1 else
+                           f"Best overall score among {stats['peers']} {label} funds"
+                           + (": " + "; ".join(reasons) if reasons else "") + "."),
+        }
+    return comparison
+
+
+class PortfolioAnalytics:
+    """Holds the PeerIndex for one snapshot; rebuilt lazily on snapshot change"""
+
+    def __init__(self):
+        self._state = (None, None)
+        self._lock = threading.Lock()
+
+    def index(self, snapshot) -> PeerIndex:
+        built_for, index = self._state
+        if built_for is not snapshot:
+            with self._lock:
+                built_for, index = self._state
+                if built_for is not snapshot:
+                    index = PeerIndex(snapshot.columns)
+                    self._state = (snapshot, index)
+        return index
+
+    def analyze(self, snapshot, user_info: Mapping[str, Any], allocations: Mapping[str, Mapping[str, Any]],
+                recommendations: Mapping[str, Sequence[Mapping[str, Any]]],
+                projections: Mapping[str, Any] = None) -> Dict[str, Any]:
+        """diversification_score, expense_impact, volatility_analysis, risk_warnings, peer_comparison"""
+        index = self.index(snapshot)
+        rows, weights, categories = _fund_weights(allocations, recommendations, index.row_by_id)
+        if not len(rows):
+            return {}
+
+        category_weights = [a.get('percentage', 0) for c, a in allocations.items() if c in set(categories)]
+        total = sum(category_weights) or 1
+        analytics = {
+            'diversification_score': diversification_score([w / total for w in category_weights], len(rows)),
+            'volatility_analysis': volatility_analysis([index.volatility_ranks[r] for r in rows.tolist()],
+                                                       weights, user_info.get('risk_tolerance', 'moderate')),
+        }
+
+        expense_ratio = float(weights @ index.expense_ratio[rows]) / 100
+        cheapest = sum(w * index.category_stats[index.categories[r]]['min_expense_ratio']
+                       for r, w in zip(rows.tolist(), weights.tolist())) / 100
+        annual_return = float(weights @ index.annual_return[rows]) / 100
+        months = HORIZON_YEARS.get(user_info.get('investment_horizon'), HORIZON_YEARS['5-10']) * 12
+        lumpsum = max(_amount(user_info.get('investment_amount')), 0.0)
+        monthly_sip = max(_amount(user_info.get('monthly_sip')), 0.0)
+        # Nothing invested means no fees to report; the key is left out
+        if lumpsum + monthly_sip > 0:
+            analytics['expense_impact'] = expense_impact(lumpsum, monthly_sip, months, annual_return,
+                                                         expense_ratio, cheapest)
+        analytics['risk_warnings'] = risk_warnings(user_info, allocations, weights,
+                                                   analytics['volatility_analysis'],
+                                                   analytics.get('expense_impact'), projections)
+        analytics['peer_comparison'] = peer_comparison(index, rows, categories)
+        return analytics
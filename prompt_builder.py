@@ -0,0 +1,211 @@
+"""Compact analysis prompts under a token budget.
+
+The prompt is split into a static prefix (system prompt, the sections we
+want back, JSON spec in JSON mode) that is built once per process, and a
+per-request body: a one-line profile, a pipe-separated fund table and one
+line per advanced_analysis card. When the estimated size is over the
+budget, low-value fields are dropped in DROP_ORDER until it fits.
+
+Token counts are estimated at ~4 characters per token, which is close
+enough for budgeting and costs nothing; the model's count_tokens is a
+network round trip.
+"""
+import os
+from typing import Any, Callable, List, Mapping, NamedTuple, Sequence, Tuple
+
+from fund_record import FundRecord
+from instrumentation import PROMPT_TOKENS
+from llm_response import JSON_INSTRUCTIONS
+
+PROMPT_TOKEN_BUDGET = int(os.getenv('LLM_PROMPT_TOKEN_BUDGET', 800))
+CHARS_PER_TOKEN = 4
+
+SYSTEM_PROMPT = """You are an expert financial advisor specializing in mutual fund investments in India.
+            You provide personalized, well-reasoned investment advice based on user profiles and fund data.
+            Always consider risk tolerance, investment horizon, and financial goals.
+            Be conservative and emphasize the importance of diversification."""
+
+ANALYSIS_INSTRUCTIONS = """Using the client profile, fund table and portfolio metrics that follow, provide a comprehensive analysis including:
+
+1. **Executive Summary**: Brief overview of the investment strategy
+2. **Risk Assessment**: Detailed risk analysis considering user's profile and selected funds
+3. **Portfolio Analysis**: Analysis of diversification, expense impact, and volatility
+4. **Investment Strategy**: Specific recommendations based on user's goals and preferences
+5. **Key Insights**: Important considerations and next steps
+6. **Risk Warnings**: Any specific risks the user should be aware of
+
+Consider the user's goal and horizon, risk tolerance and existing investments, tax bracket and
+emergency fund status, ESG and dividend preferences, and the ESG scores, volatility rankings and
+peer ranks in the fund table. Provide actionable, personalized advice that helps the user make
+informed investment decisions."""
+
+# Fields dropped first when a prompt is over budget, least useful first
+DROP_ORDER = (
+    'name', 'fund_manager', 'aum_cr', 'sortino_ratio', 'sip_10yr_return', 'existing_investments',
+    'alpha', 'peer_rank', 'esg_score', 'volatility_analysis', 'diversification_score', 'monte_carlo',
+    'dividend_preference', 'fund_type_preference', 'expense_impact',
+)
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _num(value, default=0.0) -> float:
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return default
+
+
+def _money(value) -> str:
+    return f"₹{_num(value):,.0f}"
+
+
+def _title(value) -> str:
+    return str(value).replace('_', ' ')
+
+
+# (field, label, formatter) for the profile line
+PROFILE_FIELDS: Tuple[Tuple[str, str, Callable[[Any], str]], ...] = (
+    ('name', 'name', str),
+    ('age', 'age', lambda v: f"{v}"),
+    ('annual_income', 'income', _money),
+    ('investment_amount', 'lumpsum', _money),
+    ('monthly_sip', 'SIP/month', _money),
+    ('risk_tolerance', 'risk', _title),
+    ('investment_goal', 'goal', _title),
+    ('investment_horizon', 'horizon', lambda v: f"{v}y"),
+    ('existing_investments', 'existing', _money),
+    ('tax_bracket', 'tax', lambda v: f"{v}%"),
+    ('emergency_fund', 'emergency fund', _title),
+    ('fund_type_preference', 'plan', _title),
+    ('esg_preference', 'ESG', _title),
+    ('dividend_preference', 'payout', _title),
+)
+
+# (field, column header) for the fund table; name and category are always kept
+FUND_COLUMNS: Tuple[Tuple[str, str], ...] = (
+    ('expense_ratio', 'ER%'),
+    ('sip_5yr_return', 'SIP5y%'),
+    ('sip_10yr_return', 'SIP10y%'),
+    ('alpha', 'alpha'),
+    ('beta', 'beta'),
+    ('sharpe_ratio', 'sharpe'),
+    ('sortino_ratio', 'sortino'),
+    ('esg_score', 'ESG/10'),
+    ('volatility_rank', 'vol'),
+    ('peer_rank', 'peer#'),
+    ('aum_cr', 'AUM Cr'),
+    ('fund_manager', 'manager'),
+)
+FUND_FIELDS = tuple(field for field, _ in FUND_COLUMNS)
+
+
+class PromptBuild(NamedTuple):
+    prefix: str
+    body: str
+    tokens: int
+    dropped: Tuple[str, ...]
+
+
+def _profile_segments(user_info: Mapping[str, Any]) -> List[Tuple[str, str]]:
+    segments = [('', "Client: ")]
+    segments.extend((field, f"{label} {fmt(user_info[field])}; ") for field, label, fmt in PROFILE_FIELDS
+                    if field in user_info)
+    segments.append(('', "\n"))
+    return segments
+
+
+def _fund_segments(recommendations: Mapping[str, Sequence[Mapping[str, Any]]]) -> List[Tuple[str, str]]:
+    segments = [('', "Funds (category | fund")]
+    segments.extend((field, f" | {header}") for field, header in FUND_COLUMNS)
+    segments.append(('', "):\n"))
+    for category, funds in recommendations.items():
+        for fund in funds:
+            segments.append(('', f"{category} | {fund.get('name', '')}"))
+            # Snapshot records cache their cells, so repeat funds cost nothing
+            cells = (fund.prompt_cells(FUND_FIELDS) if isinstance(fund, FundRecord)
+                     else tuple(f" | {fund.get(field, '-')}" for field in FUND_FIELDS))
+            segments.extend(zip(FUND_FIELDS, cells))
+            segments.append(('', "\n"))
+    return segments
+
+
+def _advanced_segments(advanced: Mapping[str, Any]) -> List[Tuple[str, str]]:
+    segments = []
+    proj = advanced.get('projections')
+    if proj:
+        # Normalized (cached) prompts carry no per-user rupee figures
+        if 'projected_value' in proj:
+            segments.append(('', f"Projection: {_money(proj.get('total_investment'))} invested over "
+                                 f"{proj.get('time_period', 0)}y -> {_money(proj.get('projected_value'))} "
+                                 f"at {proj.get('expected_return', 0)}% p.a."))
+        else:
+            segments.append(('', f"Projection: {proj.get('time_period', 0)}y at "
+                                 f"{proj.get('expected_return', 0)}% p.a."))
+        mc = proj.get('monte_carlo')
+        if mc:
+            spread = (f"simulated P10/P50/P90 {_money(mc.get('p10'))}/{_money(mc.get('p50'))}/"
+                      f"{_money(mc.get('p90'))}; " if 'p50' in mc else "simulated ")
+            segments.append(('monte_carlo', f"; {spread}{mc.get('probability_of_loss', 0)}% chance of loss"))
+        segments.append(('', "\n"))
+    div = advanced.get('diversification_score')
+    if div:
+        segments.append(('diversification_score',
+                         f"Diversification: {div.get('score', 0)}/150, {div.get('categories', 0)} categories, "
+                         f"{div.get('total_funds', 0)} funds - {div.get('assessment', '')}\n"))
+    exp = advanced.get('expense_impact')
+    if exp:
+        fees = (f", {_money(exp.get('total_expense_over_period'))} in fees over the period, "
+                f"{_money(exp.get('potential_savings'))} saved with the cheapest peers"
+                if 'total_expense_over_period' in exp else "")
+        segments.append(('expense_impact', f"Expenses: avg ER {exp.get('average_expense_ratio', 0)}%{fees}\n"))
+    vol = advanced.get('volatility_analysis')
+    if vol:
+        breakdown = vol.get('volatility_breakdown', {})
+        segments.append(('volatility_analysis',
+                         f"Volatility: {breakdown.get('low', 0)} low / {breakdown.get('moderate', 0)} moderate / "
+                         f"{breakdown.get('high', 0)} high funds, {_num(vol.get('high_volatility_percentage')):.1f}% "
+                         f"in high - {vol.get('risk_assessment', '')}\n"))
+    warnings = advanced.get('risk_warnings')
+    if warnings:
+        segments.append(('', "Warnings: " + " ".join(warnings) + "\n"))
+    return segments
+
+
+class PromptBuilder:
+    def __init__(self, token_budget: int = PROMPT_TOKEN_BUDGET, json_mode: bool = False):
+        self.token_budget = token_budget
+        # Identical for every request: built and measured once
+        self.prefix = f"{SYSTEM_PROMPT}\n\n{ANALYSIS_INSTRUCTIONS}\n"
+        if json_mode:
+            self.prefix += JSON_INSTRUCTIONS
+        self.prefix_tokens = estimate_tokens(self.prefix)
+
+    def segments(self, user_info: Mapping[str, Any], fund_data: Mapping[str, Any]) -> List[Tuple[str, str]]:
+        """(droppable field or '', text) pieces that concatenate to the prompt body"""
+        return (_profile_segments(user_info)
+                + _fund_segments(fund_data.get('recommendations', {}))
+                + _advanced_segments(fund_data.get('advanced_analysis', {})))
+
+    def build(self, user_info: Mapping[str, Any], fund_data: Mapping[str, Any]) -> PromptBuild:
+        segments = self.segments(user_info, fund_data)
+        # Size per droppable field, so going over budget costs no rebuilds
+        field_chars = {}
+        for field, text in segments:
+            field_chars[field] = field_chars.get(field, 0) + len(text)
+        chars = sum(field_chars.values())
+        budget_chars = (self.token_budget - self.prefix_tokens) * CHARS_PER_TOKEN
+        dropped = ()
+        for field in DROP_ORDER:
+            if chars <= budget_chars:
+                break
+            if field in field_chars:
+                dropped += (field,)
+                chars -= field_chars[field]
+        body = ''.join(text for field, text in segments if field not in dropped)
+        body = body.replace("; \n", "\n").rstrip()
+        tokens = self.prefix_tokens + estimate_tokens(body)
+        PROMPT_TOKENS.observe(tokens)
+        return PromptBuild(self.prefix, body, tokens, dropped)
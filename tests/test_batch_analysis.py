@@ -0,0 +1,84 @@
+import io
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+os.environ.setdefault('LLM_BACKEND', 'stub')
+os.environ.setdefault('LLM_STUB_LATENCY', '0')
+os.environ.setdefault('LLM_CACHE', 'off')
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from batch_analysis import BatchRunner, read_profiles, validate_profile  # noqa: E402
+from llm_recommender import LLMRecommender  # noqa: E402
+from mutual_fund_analyzer import MutualFundAnalyzer  # noqa: E402
+
+GOOD = {'name': 'A', 'age': 34, 'investment_amount': 100000, 'risk_tolerance': 'moderate'}
+
+
+@pytest.fixture(scope='module')
+def analyzer():
+    return MutualFundAnalyzer()
+
+
+def run(analyzer, profiles, llm_recommender=None):
+    runner = BatchRunner(analyzer, llm_recommender, max_workers=2, retries=0, backoff=0)
+    return list(runner.run(profiles))
+
+
+def test_bad_numeric_rows_fail_alone_with_llm(analyzer):
+    profiles = [GOOD, {'annual_income': 'abc'}, {'investment_amount': None}, dict(GOOD, name='B')]
+    results = run(analyzer, profiles, LLMRecommender())
+    assert [r['index'] for r in results] == [0, 1, 2, 3]
+    assert [r['success'] for r in results] == [True, False, False, True]
+    assert 'annual_income' in results[1]['error']
+    assert 'investment_amount' in results[2]['error']
+    assert results[3]['llm_analysis']['sections']
+
+
+@pytest.mark.parametrize('row, field', [
+    ({'age': -1}, 'age'),
+    ({'monthly_sip': float('inf')}, 'monthly_sip'),
+    ({'investment_horizon': 7}, 'investment_horizon'),
+    ({'investment_horizon': '7-9'}, 'investment_horizon'),
+    ({'tax_bracket': True}, 'tax_bracket'),
+])
+def test_validate_profile_rejects(row, field):
+    with pytest.raises(ValueError, match=field):
+        validate_profile(row)
+
+
+def test_validate_profile_coerces_numeric_text():
+    user_info = validate_profile({'investment_amount': '75000', 'age': '41'})
+    assert user_info['investment_amount'] == 75000 and user_info['age'] == 41
+
+
+class BrokenRecommender:
+    def generate_recommendations(self, user_info, recs, fallback=True):
+        raise RuntimeError("model down")
+
+    def _generate_fallback_recommendations(self, user_info, recs):
+        if user_info['name'] == 'broken':
+            raise ValueError("fallback failed")
+        return {'sections': {}}
+
+
+def test_llm_failure_marks_only_its_row(analyzer):
+    results = run(analyzer, [dict(GOOD, name='broken'), GOOD], BrokenRecommender())
+    assert results[0]['success'] is False and 'fallback failed' in results[0]['error']
+    assert results[1]['success'] is True and results[1]['llm_status'] == 'fallback'
+
+
+def test_malformed_jsonl_line_is_a_row_error(analyzer):
+    stream = io.StringIO('{"name": "A"}\n{"name": \n\n{"name": "C"}\n')
+    results = run(analyzer, read_profiles(stream, 'jsonl'))
+    assert [r['success'] for r in results] == [True, False, True]
+    assert results[1]['error'].startswith('line 2:')
+
+
+def test_unparseable_csv_number_is_rejected(analyzer):
+    stream = io.StringIO("name,investment_amount\nA,5O000\nB,50000\n")
+    results = run(analyzer, read_profiles(stream, 'csv'))
+    assert results[0]['success'] is False and "'5O000'" in results[0]['error']
+    assert results[1]['success'] is True and results[1]['user_info']['investment_amount'] == 50000
@@ -0,0 +1,40 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app import app  # noqa: E402
+from fund_search import parse_query  # noqa: E402
+
+
+@pytest.fixture
+def client():
+    return app.test_client()
+
+
+def test_min_investment_is_a_field_not_a_bound():
+    fields = ('min_investment', 'expense_ratio')
+    query = parse_query({'min_investment': '500', 'max_expense_ratio': '0.8'}, fields)
+    assert query['filters']['range'] == {'min_investment': (500.0, 500.0), 'expense_ratio': (None, 0.8)}
+
+    query = parse_query({'min_min_investment': '500', 'max_min_investment': '1000'}, fields)
+    assert query['filters']['range'] == {'min_investment': (500.0, 1000.0)}
+
+
+def test_search_filters_on_min_investment(client):
+    response = client.get('/funds/search?min_investment=500&limit=100')
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['total'] > 0
+    assert {fund['min_investment'] for fund in body['funds']} == {500}
+
+    response = client.get('/funds/search?max_min_investment=500&limit=100')
+    assert response.status_code == 200
+    assert {fund['min_investment'] for fund in response.get_json()['funds']} == {100, 500}
+
+
+def test_unknown_bound_is_rejected(client):
+    response = client.get('/funds/search?min_investment_amount=500')
+    assert response.status_code == 400